@@ -1,8 +1,12 @@
 import datetime as _datetime
 import calendar as _calendar
+import functools as _functools
+import operator as _operator
 import random as _random
+from array import array as _array
+from typing import Iterable as _Iterable, NamedTuple as _NamedTuple
 
-__all__ = ['DiscordianDate']
+__all__ = ['DiscordianDate', 'DiscordianDates', 'convert_many', 'compile_format', 'CompiledFormat']
 
 def _ordinal_suffix(number: int) -> str:
    """Return the ordinal suffix for a number (e.g., 'st', 'nd', 'rd', 'th')."""
@@ -10,8 +14,86 @@ def _ordinal_suffix(number: int) -> str:
        return "th"
    return {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
 
+_setattr = object.__setattr__
+
+class DiscordianDates(_NamedTuple):
+    """The fields of many Discordian dates at once, as parallel arrays with one entry per date.
+    On St. Tib's Day, season and weekday are -1 and day_of_season is 0."""
+    year: _array              # the Discordian year
+    season: _array            # 0-4, indexing Chaos .. The Aftermath
+    day_of_season: _array     # 1-73
+    weekday: _array           # 0-4, indexing Sweetmorn .. Setting Orange
+    is_holy_day: _array       # 1 on day 5 or 50 of a season, else 0
+
+def _year_layout() -> tuple[_array, _array, _array, _array]:
+    """The season, day of season, weekday and holy-day columns for every day of a
+    leap year, indexed by the day of the year counting from 0."""
+    season, day, weekday, holy = _array('b'), _array('b'), _array('b'), _array('B')
+    for yday in range(366):
+        if yday == 59: # St. Tib's Day
+            season.append(-1); day.append(0); weekday.append(-1); holy.append(0)
+            continue
+        adjusted = yday - 1 if yday > 59 else yday
+        season.append(adjusted // 73)
+        day.append(adjusted % 73 + 1)
+        weekday.append(adjusted % 5)
+        holy.append(adjusted % 73 + 1 in (5, 50))
+    return season, day, weekday, holy
+
+# the year's layout, for non-leap and leap years
+_LEAP_LAYOUT = _year_layout()
+_LAYOUTS = (tuple(col[:59] + col[60:] for col in _LEAP_LAYOUT), _LEAP_LAYOUT)
+
+def _empty_dates() -> DiscordianDates:
+    return DiscordianDates(_array('l'), _array('b'), _array('b'), _array('b'), _array('B'))
+
+def convert_many(dates: _Iterable[_datetime.date]) -> DiscordianDates:
+    """
+    Compute the Discordian fields for many Gregorian dates at once, without building
+    a DiscordianDate for each one.
+
+    Args:
+        dates: An iterable of datetime.date objects, or a NumPy datetime64 array.
+
+    Returns:
+        DiscordianDates: The fields as `array.array` columns, or as NumPy arrays when
+        given a NumPy array.
+    """
+    if getattr(dates, 'dtype', None) is not None and dates.dtype.kind == 'M':
+        return _convert_datetime64(dates)
+    result = _empty_dates()
+    year, season, day, weekday, holy = result
+    starts : dict[int,tuple[int,tuple]] = {}
+    for d in dates:
+        start = starts.get(d.year)
+        if start is None:
+            start = starts[d.year] = (_datetime.date(d.year, 1, 1).toordinal(), _LAYOUTS[_calendar.isleap(d.year)])
+        yday = d.toordinal() - start[0]
+        layout = start[1]
+        year.append(d.year + 1166)
+        season.append(layout[0][yday])
+        day.append(layout[1][yday])
+        weekday.append(layout[2][yday])
+        holy.append(layout[3][yday])
+    return result
+
+def _convert_datetime64(dates) -> DiscordianDates:
+    import numpy as np
+    days = dates.astype('datetime64[D]')
+    years = days.astype('datetime64[Y]')
+    yday = (days - years).astype(np.int64)
+    gyear = years.astype(np.int64) + 1970
+    leap = (gyear % 4 == 0) & ((gyear % 100 != 0) | (gyear % 400 == 0))
+    # index every year into the leap-year layout, skipping St. Tib's Day in ordinary years
+    yday += ~leap & (yday >= 59)
+    season, day, weekday, holy = (np.asarray(col)[yday] for col in _LEAP_LAYOUT)
+    return DiscordianDates(gyear + 1166, season, day, weekday, holy.astype(bool))
+
 class DiscordianDate:
-    """Represents a Discordian date, providing properties for date components and a method to format strings."""
+    """Represents a Discordian date, providing properties for date components and a method to format strings.
+    Dates are immutable, hashable and ordered, and a `timedelta` can be added to or subtracted from them."""
+
+    __slots__ = ('_gdate', '_is_tibs', '_adjusted_yday', '_season_day')
     
     # Static constants for seasons, weekdays, holy days, and exclamations
     _SEASONS = ["Chaos", "Chs", "Discord", "Dsc", "Confusion", "Cfn", "Bureaucracy", "Bcy", "The Aftermath", "Afm"]
@@ -45,14 +127,144 @@ class DiscordianDate:
         Args:
             date (datetime.date, optional): The Gregorian date. Defaults to today's date.
         """
-        self._gdate = date if date is not None else _datetime.date.today()
-        is_leap = _calendar.isleap(self._gdate.year)
-        self._is_tibs = is_leap and self._gdate.month == 2 and self._gdate.day == 29
-        day_of_year = self._gdate.timetuple().tm_yday
+        gdate = date if date is not None else _datetime.date.today()
+        is_leap = _calendar.isleap(gdate.year)
+        is_tibs = is_leap and gdate.month == 2 and gdate.day == 29
+        day_of_year = gdate.timetuple().tm_yday
         # Adjust day of year: -1 normally, -2 after February in leap years to skip St. Tib's Day
-        self._adjusted_yday = day_of_year - (2 if is_leap and self._gdate.month > 2 else 1)
+        adjusted_yday = day_of_year - (2 if is_leap and gdate.month > 2 else 1)
+        _setattr(self, '_gdate', gdate)
+        _setattr(self, '_is_tibs', is_tibs)
+        _setattr(self, '_adjusted_yday', adjusted_yday)
         # Season day is 1-73, None for St. Tib's Day
-        self._season_day = (self._adjusted_yday % 73) + 1 if not self._is_tibs else None
+        _setattr(self, '_season_day', (adjusted_yday % 73) + 1 if not is_tibs else None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'DiscordianDate is immutable, so {name} cannot be set!')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'DiscordianDate is immutable, so {name} cannot be deleted!')
+
+    def __reduce__(self):
+        return (DiscordianDate, (self._gdate,))
+
+    def __hash__(self) -> int:
+        return hash(self._gdate)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, DiscordianDate):
+            return self._gdate == other._gdate
+        return NotImplemented
+
+    def __lt__(self, other) -> bool:
+        if isinstance(other, DiscordianDate):
+            return self._gdate < other._gdate
+        return NotImplemented
+
+    def __le__(self, other) -> bool:
+        if isinstance(other, DiscordianDate):
+            return self._gdate <= other._gdate
+        return NotImplemented
+
+    def __gt__(self, other) -> bool:
+        if isinstance(other, DiscordianDate):
+            return self._gdate > other._gdate
+        return NotImplemented
+
+    def __ge__(self, other) -> bool:
+        if isinstance(other, DiscordianDate):
+            return self._gdate >= other._gdate
+        return NotImplemented
+
+    def __add__(self, other: _datetime.timedelta) -> 'DiscordianDate':
+        if isinstance(other, _datetime.timedelta):
+            return DiscordianDate(self._gdate + other)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        """Subtract a timedelta to get another DiscordianDate, or a DiscordianDate to get the timedelta between them."""
+        if isinstance(other, _datetime.timedelta):
+            return DiscordianDate(self._gdate - other)
+        if isinstance(other, DiscordianDate):
+            return self._gdate - other._gdate
+        return NotImplemented
+
+    @classmethod
+    def from_discordian(cls, year: int, season: int|str, day: int) -> 'DiscordianDate':
+        """
+        Construct the date for a day of a Discordian season, without searching.
+
+        Args:
+            year (int): The Discordian year.
+            season (int|str): The season, as a number from 0 (Chaos) to 4
+                (The Aftermath), or its full or short name.
+            day (int): The day of the season, from 1 to 73.
+
+        Returns:
+            DiscordianDate: The date.
+        """
+        if isinstance(season, str):
+            if season not in cls._SEASONS:
+                raise ValueError(f'{season!r} is not a season!')
+            season = cls._SEASONS.index(season) // 2
+        if not 0 <= season < 5:
+            raise ValueError(f'season must be from 0 to 4, not {season}!')
+        if not 1 <= day <= 73:
+            raise ValueError(f'day must be from 1 to 73, not {day}!')
+        gyear = year - 1166
+        yday = season * 73 + day - 1
+        if yday >= 59 and _calendar.isleap(gyear):
+            yday += 1 # skip St. Tib's Day
+        return cls(_datetime.date.fromordinal(_datetime.date(gyear, 1, 1).toordinal() + yday))
+
+    @classmethod
+    def tibs(cls, year: int) -> 'DiscordianDate':
+        """
+        Construct St. Tib's Day of a Discordian year.
+
+        Args:
+            year (int): The Discordian year, which must be a leap year.
+
+        Returns:
+            DiscordianDate: The date.
+        """
+        if not _calendar.isleap(year - 1166):
+            raise ValueError(f'YOLD {year} has no St. Tib\'s Day!')
+        return cls(_datetime.date(year - 1166, 2, 29))
+
+    @classmethod
+    def range(cls, start: _datetime.date, stop: _datetime.date) -> DiscordianDates:
+        """
+        Compute the Discordian fields for every day from `start` up to (but not
+        including) `stop`, a year's worth of columns at a time.
+
+        Args:
+            start (datetime.date): The first Gregorian date.
+            stop (datetime.date): The Gregorian date to stop before.
+
+        Returns:
+            DiscordianDates: The fields as `array.array` columns.
+        """
+        result = _empty_dates()
+        ordinal, end = start.toordinal(), stop.toordinal()
+        year = start.year
+        while ordinal < end:
+            first = _datetime.date(year, 1, 1).toordinal()
+            layout = _LAYOUTS[_calendar.isleap(year)]
+            lo, hi = ordinal - first, min(end - first, len(layout[0]))
+            result.year.extend(_array('l', [year + 1166]) * (hi - lo))
+            for column, days in zip(result[1:], layout):
+                column.extend(days[lo:hi])
+            ordinal = first + hi
+            year += 1
+        return result
+
+    @property
+    def gregorian(self) -> _datetime.date:
+        """The Gregorian date."""
+        return self._gdate
 
     @property
     def year(self) -> int:
@@ -113,7 +325,8 @@ class DiscordianDate:
     def format(self, fstr: str) -> str:
         """
         Format the Discordian date according to the given format string.
-        Supports ddate-compatible format codes.
+        Supports ddate-compatible format codes.  Format strings are compiled
+        (see `compile_format`) and the most recently used ones are cached.
         
         Args:
             fstr (str): The format string with ddate codes.
@@ -121,63 +334,114 @@ class DiscordianDate:
         Returns:
             str: The formatted Discordian date string.
         """
-        result = []
-        idx = 0
-        last = len(fstr)
+        return _cached_format(fstr)(self)
+
+def _day_of_season(d: DiscordianDate) -> str:
+    return '' if d.day_of_season is None else str(d.day_of_season)
+
+def _ordinal_day_of_season(d: DiscordianDate) -> str:
+    return '' if d.day_of_season is None else str(d.day_of_season) + _ordinal_suffix(d.day_of_season)
+
+# the field getters for each format code, and the literal text for the rest
+_FIELDS = {
+    'A': _operator.attrgetter('weekday'),
+    'a': _operator.attrgetter('short_weekday'),
+    'B': _operator.attrgetter('season'),
+    'b': _operator.attrgetter('short_season'),
+    'd': _day_of_season,
+    'e': _ordinal_day_of_season,
+    'H': _operator.attrgetter('holy_day_name'),
+    'X': lambda d: f"{d.days_til_xday:,}",
+    'Y': lambda d: str(d.year),
+    '.': lambda d: _random.choice(DiscordianDate._EXCLAIM),
+}
+_LITERALS = { '%': '%', 'n': '\n', 't': '\t', '}': '' }
+
+class _TibsJump(int):
+    """The `%{` op: on St. Tib's Day, announce it and jump to the op after its `%}`."""
+
+_SKIP_UNLESS_HOLY = object() # the `%N` op
+
+class CompiledFormat:
+    """A format string parsed once into literal text, field getters and control ops,
+    to format any number of dates with.  Call it with a DiscordianDate."""
+
+    def __init__(self, fstr: str):
+        self.fstr = fstr
+        ops : list = []
+        starts : dict[int,int] = {} # the ops starting at each position of fstr
+        jumps : list[tuple[int,int]] = [] # the `%{` ops, and the position of their `%}`
+        def add(op, pos: int):
+            # merge literal text, unless a `%{` jumps into the middle of it
+            if isinstance(op, str) and ops and type(ops[-1]) is str and pos not in targets:
+                ops[-1] += op
+            else:
+                starts[pos] = len(ops)
+                ops.append(op)
+        targets = set()
+        idx, last = 0, len(fstr)
         while idx < last:
-            if fstr[idx] == '%':
+            if fstr[idx] != '%':
+                add(fstr[idx], idx)
+            elif idx + 1 < last:
+                cmd = fstr[idx + 1]
+                if cmd in _FIELDS:
+                    add(_FIELDS[cmd], idx)
+                elif cmd == 'N':
+                    add(_SKIP_UNLESS_HOLY, idx)
+                elif cmd == '{':
+                    end = fstr.find('%}', idx + 1)
+                    targets.add(end + 2)
+                    jumps.append((len(ops), end))
+                    add(None, idx)
+                else:
+                    add(_LITERALS.get(cmd, cmd), idx)
                 idx += 1
-                if idx >= last:
+            idx += 1
+        for at,end in jumps:
+            # the jump lands just past the `%}`, which always starts an op (or is the end)
+            ops[at] = _TibsJump(len(ops) if end == -1 else starts.get(end + 2, len(ops)))
+        self._ops = tuple(ops)
+        self._simple = not any(op is _SKIP_UNLESS_HOLY or type(op) is _TibsJump for op in ops)
+
+    def __repr__(self) -> str:
+        return f'compile_format({self.fstr!r})'
+
+    def __call__(self, date: DiscordianDate) -> str:
+        ops = self._ops
+        if self._simple:
+            return ''.join([op if type(op) is str else op(date) for op in ops])
+        result = []
+        i, last = 0, len(ops)
+        while i < last:
+            op = ops[i]
+            if type(op) is str:
+                result.append(op)
+            elif op is _SKIP_UNLESS_HOLY:
+                if not date.is_holy_day:
                     break
-                cmd = fstr[idx]
-                match cmd:
-                    case '%':
-                        result.append('%')
-                    case 'A':
-                        result.append(self.weekday)
-                    case 'a':
-                        result.append(self.short_weekday)
-                    case 'B':
-                        result.append(self.season)
-                    case 'b':
-                        result.append(self.short_season)
-                    case 'd':
-                        if self.day_of_season is not None:
-                            result.append(str(self.day_of_season))
-                    case 'e':
-                        if self.day_of_season is not None:
-                            result.append(str(self.day_of_season) + _ordinal_suffix(self.day_of_season))
-                    case 'H':
-                        result.append(self.holy_day_name)
-                    case 'n':
-                        result.append('\n')
-                    case 't':
-                        result.append('\t')
-                    case 'X':
-                        result.append(f"{self.days_til_xday:,}")
-                    case 'Y':
-                        result.append(str(self.year))
-                    case '.':
-                        result.append(_random.choice(self._EXCLAIM))
-                    case '}':
-                        pass  # no-op
-                    case 'N':
-                        if not self.is_holy_day:
-                            idx = last  # Skip rest unless holy day
-                    case '{':
-                        if self.is_tibs:
-                            result.append("St. Tib's Day")
-                            pos = fstr.find('%}', idx)
-                            if pos != -1:
-                                idx = pos + 1  # Move to '}', loop will advance past
-                            else:
-                                idx = last  # No closing '%}', skip to end
-                        # Else, continue processing normally
-                    case _:
-                        result.append(cmd)  # Unknown command, append as is
-                idx += 1  # Move past the command character
+            elif type(op) is _TibsJump:
+                if date.is_tibs:
+                    result.append("St. Tib's Day")
+                    i = op
+                    continue
             else:
-                result.append(fstr[idx])
-                idx += 1
+                result.append(op(date))
+            i += 1
         return ''.join(result)
 
+def compile_format(fstr: str) -> CompiledFormat:
+    """
+    Parse a ddate format string once, for formatting many dates with it.
+
+    Args:
+        fstr (str): The format string with ddate codes.
+
+    Returns:
+        CompiledFormat: A callable taking a DiscordianDate to its formatted string.
+    """
+    return CompiledFormat(fstr)
+
+@_functools.lru_cache(maxsize=128)
+def _cached_format(fstr: str) -> CompiledFormat:
+    return CompiledFormat(fstr)
@@ -3,9 +3,14 @@
 from __future__ import annotations
 
 import argparse
+import csv
+import itertools
+import sys
+from collections.abc import Iterable, Iterator
+from contextlib import nullcontext
 from datetime import date, timedelta
 
-from rwt_discordian import DiscordianDate
+from rwt_discordian import DiscordianDate, compile_format
 
 TODAY_FMT = "Today is %{%A, the %e day of %B%} in the YOLD %Y%N%nCelebrate %H"
 OTHER_FMT = "%{%A, %B %d%}, %Y YOLD"
@@ -38,6 +43,52 @@ def handle_date_input(date_arg: str | None, today: date) -> date:
     return date(*parts)
 
 
+def batch_dates(lines: Iterable[str], column: str | None, header: bool = False) -> Iterator[str]:
+    """The date text from each input line: the whole line, or with `column` given,
+    the field in that CSV column (a number from 1, or a name from the header row).
+    With `header`, the first row is a header and skipped (a column name implies it)."""
+    if column is None:
+        yield from (line.strip() for line in lines)
+        return
+    rows = csv.reader(lines)
+    if column.isdigit():
+        index = int(column) - 1
+        if index < 0:
+            raise ValueError("column numbers start at 1!")
+        if header:
+            next(rows, None)
+    else:
+        header = next(rows, [])
+        if column not in header:
+            raise ValueError(f"no column named {column!r} in the header!")
+        index = header.index(column)
+    for row in rows:
+        yield row[index].strip() if index < len(row) else ""
+
+
+def run_batch(lines: Iterable[str], fmt: str, column: str | None, today: date, header: bool = False) -> int:
+    """Write the formatted date for each input line to stdout, a block at a time.
+    Blank lines stay blank, and so do lines with bad dates (which are reported
+    on stderr).  Returns the exit status."""
+    formatter = compile_format(fmt)
+    status = 0
+    for block in itertools.batched(enumerate(batch_dates(lines, column, header), 1), 4096):
+        out = []
+        for lineno, text in block:
+            if not text:
+                out.append("")
+                continue
+            try:
+                out.append(formatter(DiscordianDate(handle_date_input(text, today))))
+            except (ValueError, OverflowError) as e:
+                print(f"line {lineno}: {text!r}: {e}", file=sys.stderr)
+                out.append("")
+                status = 1
+        out.append("")
+        sys.stdout.write("\n".join(out))
+    return status
+
+
 def main() -> None:
     today = date.today()
     parser = argparse.ArgumentParser(
@@ -61,6 +112,26 @@ def main() -> None:
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
     parser.add_argument("-f", "--format", type=str, default=None, help="The format string")
+    parser.add_argument(
+        "-b",
+        "--batch",
+        metavar="FILE",
+        nargs="?",
+        const="-",
+        default=None,
+        help="Convert each date in FILE (default stdin), one per line",
+    )
+    parser.add_argument(
+        "-c",
+        "--column",
+        default=None,
+        help="With --batch, read CSV and take the date from this column (a number from 1, or a header name)",
+    )
+    parser.add_argument(
+        "--header",
+        action="store_true",
+        help="With --column, skip the CSV's header row (implied when the column is a name)",
+    )
     parser.add_argument(
         "date",
         type=lambda s: handle_date_input(s, today),
@@ -69,6 +140,22 @@ def main() -> None:
     )
     args = parser.parse_args()
 
+    if args.batch is not None:
+        if args.date != today:
+            parser.error("give dates either on the command line or with --batch, not both")
+        if args.header and args.column is None:
+            parser.error("--header only works with --column")
+        if args.batch == "-":
+            sys.stdin.reconfigure(newline="")  # as for files, so the csv module sees quoted newlines
+        try:
+            with open(args.batch, newline="") if args.batch != "-" else nullcontext(sys.stdin) as f:
+                status = run_batch(f, args.format or OTHER_FMT, args.column, today, args.header)
+        except (OSError, ValueError) as e:
+            parser.exit(1, f"ddate: {e}\n")
+        sys.exit(status)
+    if args.column is not None or args.header:
+        parser.error("--column and --header only work with --batch")
+
     dd = DiscordianDate(args.date)
     fmt = args.format
     if fmt is None:
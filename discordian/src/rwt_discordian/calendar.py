@@ -0,0 +1,179 @@
+"""Render whole Discordian years or seasons as text, HTML or iCalendar.
+
+Every season has the same 73 days and every year restarts the 5-day week,
+so the layout of each season's grid never changes: it is worked out once,
+at import, and rendering a year only fills in the year number and (in leap
+years) St. Tib's Day.
+"""
+import calendar as _calendar
+import datetime as _datetime
+import html as _html
+
+from rwt_discordian import DiscordianDate as _DiscordianDate
+
+__all__ = ['text', 'html', 'ics']
+
+_SEASONS = _DiscordianDate._SEASONS[0::2]
+_WEEKDAYS = _DiscordianDate._DAYS[1::2]
+_TIBS = "St. Tib's Day"
+
+def _holy_day(season: int, day: int) -> str:
+    if day == 5:
+        return _DiscordianDate._HOLYDAY_5[season]
+    if day == 50:
+        return _DiscordianDate._HOLYDAY_50[season]
+    return ''
+
+def _weeks(season: int) -> list[list[int|None]]:
+    """The season's days laid out in weeks, with None before the first and after the last day."""
+    first = (season * 73) % 5
+    cells = [None] * first + list(range(1, 74))
+    cells += [None] * (-len(cells) % 5)
+    return [cells[i:i+5] for i in range(0, len(cells), 5)]
+
+def _split_at_tibs(rows: list[str], weeks: list[list[int|None]]) -> tuple[str, str]:
+    """Join the rendered ROWS into the part up to the week of day 59 (St. Tib's Day comes after it) and the rest."""
+    cut = next(i for i,week in enumerate(weeks) if 59 in week) + 1
+    return ''.join(rows[:cut]), ''.join(rows[cut:])
+
+######################################################################
+# Text
+######################################################################
+
+_TEXT_HEADER = ''.join(f'{abbr:>3} ' for abbr in _WEEKDAYS).rstrip() + '\n'
+_TEXT_TIBS = f'{_TIBS:^20}'.rstrip() + '\n'
+
+def _text_season(season: int) -> tuple[str, str, str]:
+    weeks = _weeks(season)
+    rows = [''.join('    ' if day is None else f'{day:3}' + ('*' if _holy_day(season, day) else ' ')
+                    for day in week).rstrip() + '\n'
+            for week in weeks]
+    footer = '* ' + ', '.join(f'{_holy_day(season, day)} ({day})' for day in (5, 50)) + '\n'
+    return *_split_at_tibs(rows, weeks), footer
+
+_TEXT_SEASONS = [_text_season(season) for season in range(5)]
+
+def _season_text(yold: int, season: int, leap: bool) -> str:
+    before, after, footer = _TEXT_SEASONS[season]
+    title = f'{_SEASONS[season]} {yold}'
+    return ''.join((f'{title:^20}'.rstrip(), '\n', _TEXT_HEADER, before,
+                    _TEXT_TIBS if leap and season == 0 else '', after, footer))
+
+def text(yold: int, season: int|None = None) -> str:
+    """
+    Render a year, or one season of it, as plain-text grids of 5-day weeks,
+    with holy days starred and St. Tib's Day (in leap years) after the week
+    it falls in.
+
+    Args:
+        yold (int): The Discordian year.
+        season (int, optional): The season to render, from 0 (Chaos) to 4
+            (The Aftermath).  Defaults to the whole year.
+
+    Returns:
+        str: The calendar text.
+    """
+    leap = _calendar.isleap(yold - 1166)
+    return '\n'.join(_season_text(yold, s, leap) for s in _seasons(season))
+
+def _seasons(season: int|None) -> range:
+    if season is None:
+        return range(5)
+    if not 0 <= season < 5:
+        raise ValueError(f'season must be from 0 to 4, not {season}!')
+    return range(season, season + 1)
+
+######################################################################
+# HTML
+######################################################################
+
+_HTML_HEADER = '<thead><tr>' + ''.join(f'<th>{abbr}</th>' for abbr in _WEEKDAYS) + '</tr></thead>\n<tbody>\n'
+_HTML_TIBS = f'<tr class="tibs"><td colspan="5">{_html.escape(_TIBS)}</td></tr>\n'
+
+def _html_cell(season: int, day: int|None) -> str:
+    if day is None:
+        return '<td></td>'
+    holy = _holy_day(season, day)
+    if holy:
+        return f'<td class="holy" title="{_html.escape(holy)}">{day}</td>'
+    return f'<td>{day}</td>'
+
+def _html_season(season: int) -> tuple[str, str]:
+    weeks = _weeks(season)
+    rows = ['<tr>' + ''.join(_html_cell(season, day) for day in week) + '</tr>\n' for week in weeks]
+    return _split_at_tibs(rows, weeks)
+
+_HTML_SEASONS = [_html_season(season) for season in range(5)]
+
+def _season_html(yold: int, season: int, leap: bool) -> str:
+    before, after = _HTML_SEASONS[season]
+    return ''.join(('<table class="ddate-season">\n<caption>', _html.escape(_SEASONS[season]), f' {yold}</caption>\n',
+                    _HTML_HEADER, before, _HTML_TIBS if leap and season == 0 else '', after, '</tbody>\n</table>\n'))
+
+def html(yold: int, season: int|None = None) -> str:
+    """
+    Render a year, or one season of it, as HTML tables of 5-day weeks.  Holy
+    days are `<td class="holy">` cells titled with their names, and St. Tib's
+    Day (in leap years) is a `<tr class="tibs">` row after the week it falls in.
+
+    Args:
+        yold (int): The Discordian year.
+        season (int, optional): The season to render, from 0 (Chaos) to 4
+            (The Aftermath).  Defaults to the whole year, wrapped in a
+            `<div class="ddate-year">`.
+
+    Returns:
+        str: The calendar HTML.
+    """
+    leap = _calendar.isleap(yold - 1166)
+    tables = ''.join(_season_html(yold, s, leap) for s in _seasons(season))
+    if season is not None:
+        return tables
+    return f'<div class="ddate-year">\n<h2>{yold} YOLD</h2>\n{tables}</div>\n'
+
+######################################################################
+# iCalendar
+######################################################################
+
+def _ics_escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+
+def _ics_body(leap: bool, holy_days_only: bool) -> str:
+    """The events of a (leap) year, as a template to fill in with the Gregorian year `y` and the `yold`."""
+    events = []
+    start = _datetime.date(2024 if leap else 2023, 1, 1)
+    for n in range(366 if leap else 365):
+        day = start + _datetime.timedelta(days=n)
+        dd = _DiscordianDate(day)
+        if holy_days_only and not (dd.is_holy_day or dd.is_tibs):
+            continue
+        summary = dd.format('%{%A, %B %d%}') + (f': {dd.holy_day_name}' if dd.is_holy_day else '')
+        stamp = f'{{y}}{day.month:02}{day.day:02}'
+        events.append('BEGIN:VEVENT\r\n'
+                      f'UID:{stamp}@rwt-discordian\r\n'
+                      f'DTSTAMP:{stamp}T000000Z\r\n'
+                      f'DTSTART;VALUE=DATE:{stamp}\r\n'
+                      f'SUMMARY:{_ics_escape(summary)}\\, {{yold}} YOLD\r\n'
+                      'END:VEVENT\r\n')
+    return ''.join(events)
+
+_ICS_BODIES = { (leap, holy): _ics_body(leap, holy) for leap in (False, True) for holy in (False, True) }
+
+def ics(yold: int, holy_days_only: bool = False) -> str:
+    """
+    Render a year as an iCalendar file, with an all-day event for each day
+    (or only for the holy days and St. Tib's Day) named for its Discordian date.
+
+    Args:
+        yold (int): The Discordian year, which must fall in Gregorian years 1 to 9999.
+        holy_days_only (bool, optional): Only include holy days and St. Tib's Day.
+
+    Returns:
+        str: The iCalendar text, with CRLF line endings.
+    """
+    year = yold - 1166
+    if not 1 <= year <= 9999:
+        raise ValueError(f'YOLD {yold} is outside of Gregorian years 1 to 9999!')
+    body = _ICS_BODIES[_calendar.isleap(year), holy_days_only].format(y=f'{year:04}', yold=yold)
+    return ('BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//rwt_discordian//calendar//EN\r\n'
+            f'X-WR-CALNAME:{yold} YOLD\r\n{body}END:VCALENDAR\r\n')
@@ -0,0 +1,53 @@
+# Run from the directory with pypackage.toml as:
+#   python3 -m unittest discover -s tests
+
+import re
+import unittest
+from datetime import date, timedelta
+from rwt_discordian import DiscordianDate
+from rwt_discordian import calendar
+
+class TestCalendar(unittest.TestCase):
+    def test_text_season(self):
+        lines = calendar.text(3191, 4).splitlines()
+        self.assertEqual(lines[0], " The Aftermath 3191")
+        self.assertEqual(lines[1], " SM  BT  PD  PP  SO")
+        self.assertEqual(lines[2], "          1   2   3")
+        self.assertEqual(lines[3], "  4   5*  6   7   8")
+        self.assertEqual(lines[-1], "* Maladay (5), Afflux (50)")
+
+    def test_tibs(self):
+        self.assertIn("St. Tib's Day", calendar.text(3190))
+        self.assertNotIn("St. Tib's Day", calendar.text(3191))
+        self.assertNotIn("St. Tib's Day", calendar.text(3190, 1))
+        lines = calendar.text(3190, 0).splitlines()
+        self.assertEqual(lines[lines.index("   St. Tib's Day") - 1], " 56  57  58  59  60")
+        self.assertEqual(calendar.html(3190).count('<tr class="tibs">'), 1)
+        self.assertEqual(calendar.html(3266).count('<tr class="tibs">'), 0) # 2100
+
+    def test_weekdays_match_dates(self):
+        # every day in the grids sits under its own weekday
+        days = {}
+        for season, table in enumerate(calendar.html(3190).split('<table')[1:]):
+            for row in re.findall(r'<tr>(.*?)</tr>', table.split('<tbody>')[1]):
+                for weekday, cell in enumerate(re.findall(r'<td[^>]*>(\d*)</td>', row)):
+                    if cell:
+                        days[season, int(cell)] = weekday
+        self.assertEqual(len(days), 365)
+        start = date(2024, 1, 1)
+        for n in range(366):
+            dd = DiscordianDate(start + timedelta(days=n))
+            if not dd.is_tibs:
+                season = DiscordianDate._SEASONS.index(dd.season) // 2
+                self.assertEqual(days[season, dd.day_of_season], DiscordianDate._DAYS.index(dd.weekday) // 2)
+
+    def test_ics(self):
+        text = calendar.ics(3190)
+        self.assertTrue(text.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(text.endswith("END:VCALENDAR\r\n"))
+        self.assertEqual(text.count("BEGIN:VEVENT"), 366)
+        self.assertIn("DTSTART;VALUE=DATE:20240229\r\nSUMMARY:St. Tib's Day\\, 3190 YOLD\r\n", text)
+        self.assertIn("DTSTART;VALUE=DATE:20240219\r\nSUMMARY:Setting Orange\\, Chaos 50: Chaoflux\\, 3190 YOLD\r\n", text)
+        self.assertEqual(calendar.ics(3191, holy_days_only=True).count("BEGIN:VEVENT"), 10)
+        with self.assertRaises(ValueError):
+            calendar.ics(1166)
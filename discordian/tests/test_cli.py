@@ -0,0 +1,37 @@
+# Run from the directory with pypackage.toml as:
+#   python3 -m unittest discover -s tests
+
+import contextlib
+import io
+import unittest
+from datetime import date
+from rwt_discordian import _cli
+
+class TestBatch(unittest.TestCase):
+    def run_batch(self, lines, column=None):
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            status = _cli.run_batch(lines, '%d %b', column, date(2024, 1, 1))
+        return status, out.getvalue(), err.getvalue()
+
+    def test_bad_lines_stay_blank(self):
+        status, out, err = self.run_batch(['2024-1-5\n', 't+99999999999\n', 'nonsense\n', '\n', '2024-1-6\n'])
+        self.assertEqual(status, 1)
+        self.assertEqual(out, '5 Chs\n\n\n\n6 Chs\n')
+        self.assertIn('line 2:', err)
+        self.assertIn('line 3:', err)
+
+    def test_columns(self):
+        lines = ['when,what\n', '2024-1-5,x\n', ',y\n']
+        self.assertEqual(self.run_batch(lines, 'when')[:2], (0, '5 Chs\n\n'))
+        self.assertEqual(self.run_batch(lines[1:], '1')[:2], (0, '5 Chs\n\n'))
+        with self.assertRaises(ValueError):
+            self.run_batch(lines, '0')
+
+    def test_numbered_column_with_header(self):
+        lines = ['when,what\n', '2024-1-5,"two\nlines"\n', '2024-1-6,x\n']
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            status = _cli.run_batch(lines, '%d %b', '1', date(2024, 1, 1), header=True)
+        self.assertEqual((status, out.getvalue(), err.getvalue()), (0, '5 Chs\n6 Chs\n', ''))
+        self.assertEqual(list(_cli.batch_dates(lines, 'when', header=True)), ['2024-1-5', '2024-1-6'])
@@ -1,9 +1,21 @@
 # Run from the directory with pypackage.toml as:
 #   python3 -m unittest discover -s tests
 
+import pickle
 import unittest
-from rwt_discordian import DiscordianDate
-from datetime import date
+from rwt_discordian import DiscordianDate, compile_format, convert_many
+from datetime import date, timedelta
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def _fields(d: DiscordianDate) -> tuple:
+    if d.is_tibs:
+        return (d.year, -1, 0, -1, 0)
+    return (d.year, DiscordianDate._SEASONS.index(d.season) // 2, d.day_of_season,
+            DiscordianDate._DAYS.index(d.weekday) // 2, int(d.is_holy_day))
 
 class Test1(unittest.TestCase):
     def test_basic_xday(self):
@@ -34,5 +46,72 @@ class Test1(unittest.TestCase):
         self.assertEqual(d.season, "Confusion")
         self.assertEqual(d.short_season, "Cfn")
         self.assertEqual(d.day_of_season, 6)
-    
 
+    def test_range_matches_dates(self):
+        start, stop = date(1899, 12, 25), date(1904, 3, 3)
+        days = [start + timedelta(days=n) for n in range((stop - start).days)]
+        dates = DiscordianDate.range(start, stop)
+        self.assertEqual(len(dates.year), len(days))
+        for i, day in enumerate(days):
+            self.assertEqual(tuple(col[i] for col in dates), _fields(DiscordianDate(day)))
+        self.assertEqual(tuple(convert_many(days)), tuple(dates))
+        self.assertEqual(len(DiscordianDate.range(stop, start).year), 0)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_matches_dates(self):
+        days = [date(1956, 2, 19), date(2024, 2, 29), date(2023, 3, 1), date(2024, 3, 1), date(1969, 12, 31)]
+        dates = convert_many(numpy.array(days, dtype='datetime64[D]'))
+        for i, day in enumerate(days):
+            self.assertEqual(tuple(int(col[i]) for col in dates), _fields(DiscordianDate(day)))
+
+    def test_format(self):
+        holy, tibs, plain = DiscordianDate(date(1956,2,19)), DiscordianDate(date(2024,2,29)), DiscordianDate(date(1977,6,1))
+        fmt = "Today is %{%A, the %e day of %B%} in the YOLD %Y%N%nCelebrate %H"
+        self.assertEqual(holy.format(fmt), "Today is Setting Orange, the 50th day of Chaos in the YOLD 3122\nCelebrate Chaoflux")
+        self.assertEqual(tibs.format(fmt), "Today is St. Tib's Day in the YOLD 3190")
+        self.assertEqual(plain.format(fmt), "Today is Boomtime, the 6th day of Confusion in the YOLD 3143")
+        self.assertEqual(plain.format("%a%t%b %d%%%q %"), "BT\tCfn 6%q ")
+        self.assertEqual(tibs.format("%{a%%}b%}!"), "St. Tib's Dayb!")
+        self.assertEqual(tibs.format("%{no end"), "St. Tib's Day")
+        self.assertEqual(f"{tibs:%d%e}", "")
+
+    def test_compile_format(self):
+        fmt = compile_format("%{%A, %B %d%}, %Y YOLD")
+        for day in (date(2024,2,29), date(2024,3,1), date(1956,2,19)):
+            d = DiscordianDate(day)
+            self.assertEqual(fmt(d), d.format(fmt.fstr))
+        self.assertEqual(fmt(DiscordianDate(date(2024,2,29))), "St. Tib's Day, 3190 YOLD")
+
+    def test_from_discordian(self):
+        start = date(1999, 12, 1)
+        for n in range(3 * 366):
+            d = DiscordianDate(start + timedelta(days=n))
+            if d.is_tibs:
+                self.assertEqual(DiscordianDate.tibs(d.year), d)
+            else:
+                season = DiscordianDate._SEASONS.index(d.season) // 2
+                self.assertEqual(DiscordianDate.from_discordian(d.year, season, d.day_of_season), d)
+        self.assertEqual(DiscordianDate.from_discordian(3122, 'Chs', 50).gregorian, date(1956, 2, 19))
+        self.assertEqual(DiscordianDate.from_discordian(3190, 'Chaos', 60).gregorian, date(2024, 3, 1))
+        with self.assertRaises(ValueError):
+            DiscordianDate.tibs(3191)
+        with self.assertRaises(ValueError):
+            DiscordianDate.from_discordian(3191, 5, 1)
+        with self.assertRaises(ValueError):
+            DiscordianDate.from_discordian(3191, 'Chaos', 74)
+
+    def test_value_semantics(self):
+        d = DiscordianDate(date(2024, 2, 28))
+        with self.assertRaises(AttributeError):
+            d.season = 'Discord'
+        with self.assertRaises(AttributeError):
+            d._gdate = date(2000, 1, 1)
+        self.assertEqual(d, DiscordianDate(date(2024, 2, 28)))
+        self.assertEqual(len({d, DiscordianDate(date(2024, 2, 28)), d + timedelta(days=1)}), 2)
+        self.assertTrue((d + timedelta(days=1)).is_tibs)
+        self.assertEqual(timedelta(days=2) + d, DiscordianDate(date(2024, 3, 1)))
+        self.assertEqual(d - timedelta(days=28), DiscordianDate(date(2024, 1, 31)))
+        self.assertEqual(DiscordianDate(date(2024, 3, 1)) - d, timedelta(days=2))
+        self.assertLess(d, d + timedelta(days=1))
+        self.assertEqual(sorted([d + timedelta(days=1), d]), [d, d + timedelta(days=1)])
+        self.assertEqual(pickle.loads(pickle.dumps(d)), d)
@@ -5,11 +5,20 @@
 # and a clean 3-level TOC with targets by filename or 1-based chapter number.
 
 from pathlib import Path as _Path
+import os as _os
+import hashlib as _hashlib
+import shutil as _shutil
+import struct as _struct
+import time as _time
 import zipfile as _zipfile
+import zlib as _zlib
 import uuid as _uuid
 import datetime as _datetime
 import importlib.resources as _resources
-from collections import namedtuple as _namedtuple
+from collections import deque as _deque, namedtuple as _namedtuple
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+from os import PathLike as _PathLike
+from typing import BinaryIO as _BinaryIO
 
 _ContentItem = _namedtuple("_ContentItem", ["fname", "zip_path", "media_type", "properties"])
 _TocEntry = _namedtuple("_TocEntry", ["level", "target", "text"])
@@ -38,6 +47,28 @@ _MEDIA_TYPES: dict[str, str] = {
     "css": "text/css",
 }
 
+# Compression for each media type: a DEFLATE level (0-9), or None to store it
+# as-is.  The "*" entry covers everything else (the package file, container.xml).
+# Raster images are already compressed, so deflating them gains next to nothing.
+_DEFAULT_COMPRESSION: dict[str, int | None] = {
+    "image/gif": None,
+    "image/jpeg": None,
+    "image/png": None,
+    "image/webp": None,
+    "image/svg+xml": 9,
+    "application/xhtml+xml": 9,
+    "text/css": 9,
+    "*": 9,
+}
+# For draft builds: still no work on images, and the fastest DEFLATE for the rest.
+_FAST_COMPRESSION: dict[str, int | None] = {
+    **_DEFAULT_COMPRESSION,
+    "image/svg+xml": 1,
+    "application/xhtml+xml": 1,
+    "text/css": 1,
+    "*": 1,
+}
+
 def _ensure_extension(name: str, ext: str) -> str:
     """If the name does not end with ext, add it"""
     if not name.lower().endswith(ext):
@@ -104,6 +135,70 @@ def _jpeg_dimensions(data: bytes) -> tuple[int, int] | None:
     return None
 
 
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}  # not DHT, JPG, DAC
+
+
+def _image_file_dimensions(f: _BinaryIO) -> tuple[int, int] | None:
+    """Return (width, height) for a GIF, JPEG, PNG or WebP image file, or None if
+    it cannot be determined.
+
+    Only the header is read: a few bytes for most formats, and for JPEG each
+    marker's length, seeking past the segments up to the Start-Of-Frame.
+    """
+    head = f.read(30)
+    if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+        return (int.from_bytes(head[16:20], "big"), int.from_bytes(head[20:24], "big"))
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return (int.from_bytes(head[6:8], "little"), int.from_bytes(head[8:10], "little"))
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP" and len(head) == 30:
+        match head[12:16]:
+            case b"VP8 ":
+                return (int.from_bytes(head[26:28], "little") & 0x3FFF, int.from_bytes(head[28:30], "little") & 0x3FFF)
+            case b"VP8L":
+                bits = int.from_bytes(head[21:25], "little")
+                return ((bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+            case b"VP8X":
+                return (int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1)
+        return None
+    if head[:2] != b"\xff\xd8":
+        return None
+    f.seek(2)
+    while True:
+        marker = f.read(4)
+        if len(marker) < 4 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0xD8, 0xD9) or 0xD0 <= marker[1] <= 0xD7:  # SOI, EOI, RSTn — no length
+            f.seek(-2, _os.SEEK_CUR)
+            continue
+        if marker[1] in _JPEG_SOF_MARKERS:
+            # precision, then big-endian height and width
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            return (int.from_bytes(frame[3:5], "big"), int.from_bytes(frame[1:3], "big"))
+        f.seek(int.from_bytes(marker[2:4], "big") - 2, _os.SEEK_CUR)
+
+
+# Deterministic builds name their identifiers from the book's digest in this namespace
+_BOOK_ID_NAMESPACE = _uuid.uuid5(_uuid.NAMESPACE_URL, "https://github.com/rwtodd/small_python_packages/rwt_epub")
+
+# Copy files into the archive this much at a time
+_COPY_CHUNK_SIZE = 1 << 20
+
+
+def _deflate(data: bytes, level: int | None) -> tuple[int, bytes]:
+    """Return the CRC and the compressed form of a member's DATA: raw DEFLATE at
+    LEVEL (exactly as zipfile would compress it), or DATA itself when LEVEL is None.
+
+    zlib releases the GIL while it works, so this runs well on a thread pool.
+    """
+    crc = _zlib.crc32(data)
+    if level is None:
+        return crc, data
+    compressor = _zlib.compressobj(level, _zlib.DEFLATED, -15)
+    return crc, compressor.compress(data) + compressor.flush()
+
+
 class EpubWriter:
     @staticmethod
     def media_type(fname: str) -> str:
@@ -137,10 +232,41 @@ class EpubWriter:
         """Generate the filename for the content.opf file."""
         return "OEBPS/content.opf"
 
-    def __init__(self, fname: str, title: str, author: str, pubyear: int, language: str = "en"):
+    def __init__(
+        self,
+        fname: str,
+        title: str,
+        author: str,
+        pubyear: int,
+        language: str = "en",
+        compression: dict[str, int | None] | None = None,
+        fast: bool = False,
+        workers: int | None = 1,
+        deterministic: bool = False,
+        modified: _datetime.datetime | None = None,
+        previous: str | _PathLike | None = None,
+    ):
         """Create an EPUB file and prepare to fill it with contents.
 
         language: BCP 47 language tag (e.g. "en", "ja", "ja-JP"). Defaults to "en".
+        compression: DEFLATE levels (0-9) by media type, or None to store files of
+            that type uncompressed, with "*" for any other type.  These override the
+            default policy, which stores GIF/JPEG/PNG/WebP images as-is and deflates
+            everything else at level 9.
+        fast: start from a policy for quick draft builds instead, which deflates
+            at level 1.
+        workers: compress members added from memory on this many threads (None
+            for one per CPU), instead of on the calling thread.  Members are still
+            written in the order they were added.
+        deterministic: make the same inputs give a byte-identical file: every member
+            gets the same fixed timestamp (that of MODIFIED), the identifier is
+            derived from the contents instead of random, and dcterms:modified is
+            MODIFIED, which defaults to January 1st of PUBYEAR.  MODIFIED can only
+            be given for deterministic builds (others use today's date).
+        previous: an earlier deterministic build of the book (possibly FNAME
+            itself) to rebuild from.  Members whose contents and compression haven't
+            changed are copied over still compressed, and only the rest are
+            compressed again.  Implies DETERMINISTIC.  Ignored if it doesn't exist.
         """
         self._title = title
         self._author = author
@@ -152,17 +278,150 @@ class EpubWriter:
         self._spine: list[str] = []
         self._toc_entries: list[_TocEntry] = []
         self._stylesheets: list[str] = []  # basenames, in the order added (for link order)
-        self._zipfile = _zipfile.ZipFile(
-            _ensure_epub_extension(fname), "w", compression=_zipfile.ZIP_DEFLATED, compresslevel=9
-        )
-        self._zipfile.writestr("mimetype", "application/epub+zip", _zipfile.ZIP_STORED)
-        self._zipfile.writestr("META-INF/container.xml", _CONTAINER_XML)
+        self._compression = {**(_FAST_COMPRESSION if fast else _DEFAULT_COMPRESSION), **(compression or {})}
+        self._deterministic = deterministic or previous is not None
+        if modified is not None and not self._deterministic:
+            raise ValueError("modified= is only for deterministic builds!")
+        self._modified = modified or _datetime.datetime(pubyear, 1, 1)
+        self._date_time = (max(self._modified.year, 1980), *self._modified.timetuple()[1:6]) if self._deterministic else None
+        self._book_digest = _hashlib.sha256(f"{title}\0{author}\0{pubyear}\0{language}\0".encode("utf-8"))
+        fname = _ensure_epub_extension(fname)
+        self._fname = fname
+        self._previous: _zipfile.ZipFile | None = None
+        if previous is not None and _os.path.exists(previous):
+            self._previous = _zipfile.ZipFile(previous)
+            if _os.path.exists(fname) and _os.path.samefile(previous, fname):
+                # build next to it, and replace it on close()
+                fname += ".partial"
+        self._zipfile = _zipfile.ZipFile(fname, "w", compression=_zipfile.ZIP_DEFLATED, compresslevel=9)
+        zinfo = self._zipinfo("mimetype", "*")
+        zinfo.compress_type = _zipfile.ZIP_STORED
+        self._zipfile.writestr(zinfo, "application/epub+zip")
+        if workers is None:
+            workers = _os.cpu_count() or 1
+        self._pool = _ThreadPoolExecutor(workers) if workers > 1 else None
+        # members waiting to be written, oldest first: (zinfo, size, future of (crc, compressed)),
+        # or (zinfo, None, the previous build's entry) for one copied from there
+        self._pending: _deque = _deque()
+        self._max_pending = 4 * workers
+        self._writestr("META-INF/container.xml", _CONTAINER_XML, "*")
+
+    def _zipinfo(self, zip_path: str, media_type: str) -> _zipfile.ZipInfo:
+        """The entry for a new member, compressed as the policy says for its media type."""
+        zinfo = _zipfile.ZipInfo(zip_path, date_time=self._date_time or _time.localtime(_time.time())[:6])
+        zinfo.external_attr = 0o600 << 16
+        level = self._compression.get(media_type, self._compression["*"])
+        if level is None:
+            zinfo.compress_type = _zipfile.ZIP_STORED
+        else:
+            zinfo.compress_type = _zipfile.ZIP_DEFLATED
+            zinfo.compress_level = level
+        return zinfo
+
+    def _writestr(self, zip_path: str, data: str | bytes, media_type: str):
+        """Write a member to the archive from memory, or hand it to the pool to compress."""
+        zinfo = self._zipinfo(zip_path, media_type)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if self._deterministic and self._reuse(zinfo, _hashlib.sha256(data).hexdigest()):
+            return
+        if self._pool is None:
+            self._zipfile.writestr(zinfo, data)
+            return
+        level = None if zinfo.compress_type == _zipfile.ZIP_STORED else zinfo.compress_level
+        self._pending.append((zinfo, len(data), self._pool.submit(_deflate, data, level)))
+        self._write_pending(wait=False)
+
+    def _write_pending(self, wait: bool = True):
+        """Write the members from the pool or the previous build, in order: all of them
+        when WAIT, else the ones already done (and enough more to bound the memory they hold)."""
+        while self._pending and (
+            wait or self._pending[0][1] is None or self._pending[0][2].done() or len(self._pending) > self._max_pending
+        ):
+            zinfo, size, future = self._pending.popleft()
+            if size is None:
+                self._write_raw(zinfo, self._previous_raw(future))
+                continue
+            zinfo.CRC, raw = future.result()
+            zinfo.file_size = size
+            zinfo.compress_size = len(raw)
+            self._write_raw(zinfo, [raw])
+
+    def _reuse(self, zinfo: _zipfile.ZipInfo, digest: str) -> bool:
+        """Record the new member's content DIGEST (in its comment, where the next
+        rebuild will look for it).  If the previous build has the member with the
+        same contents, compressed the same way, queue it to be copied from there
+        instead and return True."""
+        level = "stored" if zinfo.compress_type == _zipfile.ZIP_STORED else zinfo.compress_level
+        zinfo.comment = f"{level}:{digest}".encode("ascii")
+        self._book_digest.update(zinfo.filename.encode("utf-8") + b"\0" + zinfo.comment + b"\n")
+        old = self._previous.NameToInfo.get(zinfo.filename) if self._previous is not None else None
+        if old is None or old.comment != zinfo.comment or old.compress_type != zinfo.compress_type:
+            return False
+        zinfo.CRC, zinfo.file_size, zinfo.compress_size = old.CRC, old.file_size, old.compress_size
+        self._pending.append((zinfo, None, old))
+        self._write_pending(wait=self._pool is None)
+        return True
+
+    def _previous_raw(self, old: _zipfile.ZipInfo):
+        """The still-compressed bytes of the previous build's member OLD, a chunk at a time."""
+        f = self._previous.fp
+        f.seek(old.header_offset)
+        header = f.read(30)
+        if header[:4] != b"PK\x03\x04":
+            raise _zipfile.BadZipFile(f"Bad local header for {old.filename} in the previous build")
+        name_len, extra_len = _struct.unpack("<HH", header[26:30])
+        f.seek(name_len + extra_len, _os.SEEK_CUR)
+        remaining = old.compress_size
+        while remaining:
+            chunk = f.read(min(remaining, _COPY_CHUNK_SIZE))
+            if not chunk:
+                raise _zipfile.BadZipFile(f"Truncated {old.filename} in the previous build")
+            remaining -= len(chunk)
+            yield chunk
+
+    def _write_raw(self, zinfo: _zipfile.ZipInfo, raw):
+        """Append a member whose CRC and sizes are known, from RAW, its already-compressed bytes in chunks.
+
+        zipfile has no public way to do this, so this does what its own member
+        writer does: local header, data, then record the entry for the central directory.
+        """
+        zf = self._zipfile
+        zip64 = zinfo.file_size > _zipfile.ZIP64_LIMIT or zinfo.compress_size > _zipfile.ZIP64_LIMIT
+        zf._writecheck(zinfo)
+        zf._didModify = True
+        zinfo.flag_bits = 0
+        zinfo.header_offset = zf.fp.tell()
+        zf.fp.write(zinfo.FileHeader(zip64))
+        for chunk in raw:
+            zf.fp.write(chunk)
+        zf.start_dir = zf.fp.tell()
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
+
+    def _write_file(self, zip_path: str, f: _BinaryIO, media_type: str):
+        """Write a member to the archive, copying it from the (seekable) binary file F a chunk at a time."""
+        self._write_pending()
+        zinfo = self._zipinfo(zip_path, media_type)
+        if self._deterministic:
+            start = f.tell()
+            digest = _hashlib.file_digest(f, "sha256").hexdigest()
+            f.seek(start)
+            if self._reuse(zinfo, digest):
+                return
+        zinfo.file_size = _os.fstat(f.fileno()).st_size - f.tell()  # so that huge files get ZIP64 headers
+        with self._zipfile.open(zinfo, "w") as dest:
+            _shutil.copyfileobj(f, dest, _COPY_CHUNK_SIZE)
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_value, exc_tb):
-        self.close()
+        if exc_type is None:
+            self.close()
+        else:
+            # don't finish a book whose contents never all arrived
+            self._finish(completed=False)
 
     def _ensure_cover(self):
         """If the user never supplied a cover image, inject the packaged default cover.
@@ -184,10 +443,29 @@ class EpubWriter:
 
     def close(self):
         """Write the navigation document and package file, then close the archive."""
-        self._ensure_cover()
-        self._generate_nav_page()
-        self._generate_content_opf()
+        completed = False
+        try:
+            self._ensure_cover()
+            self._generate_nav_page()
+            self._generate_content_opf()
+            self._write_pending()
+            completed = True
+        finally:
+            self._finish(completed)
+
+    def _finish(self, completed: bool):
+        """Shut down the pool and close the archives.  A rebuild over PREVIOUS itself
+        only replaces it when COMPLETED, and otherwise its partial file is removed."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=not completed)
         self._zipfile.close()
+        if self._previous is not None:
+            self._previous.close()
+        if self._zipfile.filename != self._fname:
+            if completed:
+                _os.replace(self._zipfile.filename, self._fname)
+            else:
+                _os.unlink(self._zipfile.filename)
 
     def _generate_content_opf(self):
         # _ensure_cover() in close() guarantees this is never None for normal use.
@@ -195,6 +473,12 @@ class EpubWriter:
             raise Exception("Internal error: no cover was set (this should be impossible)")
         if len(self._spine) == 0:
             raise Exception("Spine is empty!")
+        if self._deterministic:
+            modified = self._modified.strftime("%Y-%m-%dT%H:%M:%SZ")
+            book_id = _uuid.uuid5(_BOOK_ID_NAMESPACE, self._book_digest.hexdigest())
+        else:
+            modified = f"{_datetime.date.today().isoformat()}T12:00:00Z"
+            book_id = _uuid.uuid4()
 
         parts: list[str] = []
         parts.append(
@@ -206,8 +490,8 @@ class EpubWriter:
     <meta refines="#cre" property="role" scheme="marc:relators">aut</meta>
     <dc:date>{self._pubyear}</dc:date>
     <dc:title>{self._title}</dc:title>
-    <meta property="dcterms:modified">{_datetime.date.today().isoformat()}T12:00:00Z</meta>
-    <dc:identifier id="BookId">urn:uuid:{_uuid.uuid4()}</dc:identifier>
+    <meta property="dcterms:modified">{modified}</meta>
+    <dc:identifier id="BookId">urn:uuid:{book_id}</dc:identifier>
     <meta name="cover" content="{self._coverfile}" />
   </metadata>
   <manifest>"""
@@ -226,7 +510,7 @@ class EpubWriter:
             parts.append(f'    <itemref idref="{pg}"/>')
         parts.append("  </spine>")
         parts.append("</package>")
-        self._zipfile.writestr(self.content_path(), "\n".join(parts))
+        self._writestr(self.content_path(), "\n".join(parts), "application/oebps-package+xml")
 
     def _generate_nav_page(self):
         """Create the nav.xhtml file (EPUB Navigation Document)."""
@@ -271,7 +555,7 @@ ol {{ list-style-type: none; }}
         )
         xhtml_fname = "nav.xhtml"
         zip_path = self.xhtml_path(xhtml_fname)
-        self._zipfile.writestr(zip_path, "\n".join(parts))
+        self._writestr(zip_path, "\n".join(parts), self.media_type(xhtml_fname))
         self._contents.append(
             _ContentItem(
                 fname=xhtml_fname,
@@ -357,18 +641,47 @@ ol {{ list-style-type: none; }}
         If is_cover=True (or this is the first image), it becomes the cover.
         Provide img_dims when you will later call add_fullpage_pic for this image.
         """
+        zip_path = self.img_path(img_fname)
+        media_type = self.media_type(img_fname)
+        self._writestr(zip_path, img_data, media_type)
+        self._register_image(img_fname, zip_path, media_type, is_cover, img_dims)
+
+    def add_image_file(
+        self,
+        path: str | _os.PathLike,
+        img_fname: str | None = None,
+        is_cover: bool = False,
+        img_dims: tuple[int, int] | None = None,
+    ):
+        """Add an image file from disk to the EPUB, without reading it all into memory.
+
+        img_fname defaults to the file's name.  Unless img_dims is given, the
+        dimensions of GIF, JPEG, PNG and WebP images are read from the file's
+        header, so add_fullpage_pic works for it.  Otherwise as add_image_content.
+        """
+        img_fname = img_fname or _Path(path).name
+        zip_path = self.img_path(img_fname)
+        media_type = self.media_type(img_fname)
+        with open(path, "rb") as f:
+            if img_dims is None:
+                img_dims = _image_file_dimensions(f)
+                f.seek(0)
+            self._write_file(zip_path, f, media_type)
+        self._register_image(img_fname, zip_path, media_type, is_cover, img_dims)
+
+    def _register_image(
+        self, img_fname: str, zip_path: str, media_type: str, is_cover: bool, img_dims: tuple[int, int] | None
+    ):
         if self._coverfile is None or is_cover:
             self._coverfile = img_fname
         if img_dims is not None:
             self._img_dims[img_fname] = img_dims
         props = "cover-image" if is_cover else ""
-        zip_path = self.img_path(img_fname)
-        self._zipfile.writestr(zip_path, img_data)
         self._contents.append(
             _ContentItem(
                 fname=img_fname,
                 zip_path=zip_path,
-                media_type=self.media_type(img_fname),
+                media_type=media_type,
                 properties=props,
             )
         )
@@ -408,12 +721,28 @@ ol {{ list-style-type: none; }}
         """
         xhtml_fname = _ensure_xhtml_extension(xhtml_fname)
         zip_path = self.xhtml_path(xhtml_fname)
-        self._zipfile.writestr(zip_path, xhtml_content)
+        media_type = self.media_type(xhtml_fname)
+        self._writestr(zip_path, xhtml_content, media_type)
+        self._register_xhtml(xhtml_fname, zip_path, media_type, properties)
+
+    def add_xhtml_file(self, path: str | _os.PathLike, xhtml_fname: str | None = None, properties: str = ""):
+        """Add a complete XHTML document from disk, without reading it all into memory.
+
+        xhtml_fname defaults to the file's name.  Otherwise as add_xhtml_content.
+        """
+        xhtml_fname = _ensure_xhtml_extension(xhtml_fname or _Path(path).name)
+        zip_path = self.xhtml_path(xhtml_fname)
+        media_type = self.media_type(xhtml_fname)
+        with open(path, "rb") as f:
+            self._write_file(zip_path, f, media_type)
+        self._register_xhtml(xhtml_fname, zip_path, media_type, properties)
+
+    def _register_xhtml(self, xhtml_fname: str, zip_path: str, media_type: str, properties: str):
         self._contents.append(
             _ContentItem(
                 fname=xhtml_fname,
                 zip_path=zip_path,
-                media_type=self.media_type(xhtml_fname),
+                media_type=media_type,
                 properties=properties,
             )
         )
@@ -432,12 +761,13 @@ ol {{ list-style-type: none; }}
         css_fname = _ensure_css_extension(css_fname)
         data = css_data.encode("utf-8") if isinstance(css_data, str) else css_data
         zip_path = self.css_path(css_fname)
-        self._zipfile.writestr(zip_path, data)
+        media_type = self.media_type(css_fname)
+        self._writestr(zip_path, data, media_type)
         self._contents.append(
             _ContentItem(
                 fname=css_fname,
                 zip_path=zip_path,
-                media_type=self.media_type(css_fname),
+                media_type=media_type,
                 properties="",
             )
         )
@@ -0,0 +1,203 @@
+# Run from the directory with pyproject.toml as:
+#   python3 -m unittest discover -s tests
+
+import io
+import os
+import random
+import re
+import tempfile
+import unittest
+import uuid
+import zipfile
+import zlib
+from rwt_epub import EpubWriter, _image_file_dimensions
+
+_IMAGE = random.Random(1).randbytes(200_000)
+
+def _chapter(i: int) -> str:
+    return f"<h1>Chapter {i}</h1>\n" + f"<p>Paragraph {i} of the book.</p>\n" * 500
+
+def _png(width: int, height: int) -> bytes:
+    return b"\x89PNG\r\n\x1a\n\0\0\0\rIHDR" + width.to_bytes(4, "big") + height.to_bytes(4, "big") + b"\x08\x02\0\0\0"
+
+def _jpeg(sof: int, width: int, height: int) -> bytes:
+    app0 = b"\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    frame = b"\xff" + bytes([sof]) + b"\x00\x11\x08" + height.to_bytes(2, "big") + width.to_bytes(2, "big") + b"\x03" + bytes(9)
+    return b"\xff\xd8" + app0 + frame + b"\xff\xd9"
+
+def _webp(chunk: bytes, payload: bytes) -> bytes:
+    payload = payload.ljust(10, b"\0")
+    return b"RIFF" + (len(payload) + 12).to_bytes(4, "little") + b"WEBP" + chunk + len(payload).to_bytes(4, "little") + payload
+
+class TestImageDimensions(unittest.TestCase):
+    def dims(self, data: bytes):
+        return _image_file_dimensions(io.BytesIO(data))
+
+    def test_formats(self):
+        self.assertEqual(self.dims(_png(640, 914)), (640, 914))
+        self.assertEqual(self.dims(b"GIF89a\x80\x02\x92\x03" + bytes(20)), (640, 914))
+        self.assertEqual(self.dims(b"GIF87a\x01\x00\x02\x00"), (1, 2))
+        self.assertEqual(self.dims(_jpeg(0xC0, 640, 914)), (640, 914))
+        self.assertEqual(self.dims(_jpeg(0xC2, 1200, 80)), (1200, 80))
+        # a leading RST marker (no length) before the APP segment
+        self.assertEqual(self.dims(b"\xff\xd8\xff\xd0" + _jpeg(0xC0, 3, 4)[2:]), (3, 4))
+        # VP8: the top two bits of each 16-bit field are the scale, not size
+        vp8 = b"\x9d\x01\x2a" + (0x4000 | 640).to_bytes(2, "little") + (0xC000 | 914).to_bytes(2, "little")
+        self.assertEqual(self.dims(_webp(b"VP8 ", b"\0\0\0" + vp8)), (640, 914))
+        vp8l = (639 | (913 << 14) | (1 << 28)).to_bytes(4, "little")
+        self.assertEqual(self.dims(_webp(b"VP8L", b"\x2f" + vp8l)), (640, 914))
+        vp8x = b"\x10\0\0\0" + (70000 - 1).to_bytes(3, "little") + (914 - 1).to_bytes(3, "little")
+        self.assertEqual(self.dims(_webp(b"VP8X", vp8x)), (70000, 914))
+
+    def test_unknown_or_truncated(self):
+        for data in (b"", b"garbage, not an image", _png(1, 2)[:14], b"GIF8",
+                     _jpeg(0xC0, 640, 914)[:25], b"\xff\xd8\xff\xe0\x00\x10JF",
+                     _webp(b"VP8X", bytes(10))[:25], _webp(b"ALPH", bytes(10)),
+                     b"\xff\xd8\xff\xd9"):
+            with self.subTest(data=data):
+                self.assertIsNone(self.dims(data))
+
+class TestBuilds(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmpdir.name, name)
+
+    def build(self, name: str, chapters: dict[int, str] | None = None, **kw) -> bytes:
+        """Build a small book, with CHAPTERS replacing the usual text of some chapters,
+        and return the bytes of the file."""
+        chapters = chapters or {}
+        with EpubWriter(self.path(name), "Title", "Author", 2025, **kw) as w:
+            w.add_stylesheet("book", "body { margin: 1em; }")
+            for i in range(4):
+                w.add_image_content(f"pic{i}.jpg", _IMAGE + bytes([i]), img_dims=(10, 10))
+            for i in range(12):
+                w.add_xhtml_body(f"ch{i:02}", chapters.get(i, _chapter(i)), title=f"Chapter {i}")
+                w.add_toc_entry(f"Chapter {i}", i + 1)
+        with open(self.path(name), "rb") as f:
+            return f.read()
+
+    def test_parallel_matches_serial(self):
+        serial = self.build("serial.epub", deterministic=True)
+        parallel = self.build("parallel.epub", deterministic=True, workers=4)
+        self.assertEqual(serial, parallel)
+        with zipfile.ZipFile(self.path("parallel.epub")) as zf:
+            self.assertIsNone(zf.testzip())
+            first = zf.infolist()[0]
+            self.assertEqual(first.filename, "mimetype")
+            self.assertEqual(first.compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zf.read("mimetype"), b"application/epub+zip")
+            opf = zf.read("OEBPS/content.opf").decode("utf-8")
+            hrefs = dict(re.findall(r'<item id="([^"]+)" href="([^"]+)"', opf))
+            spine = ["OEBPS/" + hrefs[idref] for idref in re.findall(r'<itemref idref="([^"]+)"', opf)]
+            spine.remove("OEBPS/Text/nav.xhtml")  # generated last, on close()
+            members = [name for name in zf.namelist() if name in spine]
+            self.assertEqual(members, spine)
+            self.assertEqual(zf.read("OEBPS/Text/ch03.xhtml").count(b"Paragraph 3 "), 500)
+
+    def test_rebuild_unchanged(self):
+        full = self.build("full.epub", deterministic=True)
+        self.assertEqual(full, self.build("again.epub", deterministic=True))
+        self.assertEqual(full, self.build("incremental.epub", previous=self.path("full.epub")))
+        self.assertEqual(full, self.build("incremental.epub", previous=self.path("incremental.epub"), workers=4))
+        self.assertEqual(full, self.build("missing.epub", previous=self.path("nonexistent.epub")))
+
+    def test_rebuild_one_chapter_changed(self):
+        self.build("old.epub", deterministic=True)
+        changed = {5: "<p>A new chapter five.</p>"}
+        full = self.build("full.epub", changed, deterministic=True)
+        self.assertEqual(full, self.build("incremental.epub", changed, previous=self.path("old.epub")))
+        self.assertEqual(full, self.build("old.epub", changed, previous=self.path("old.epub")))
+        self.assertEqual(os.listdir(self.tmpdir.name).count("old.epub.partial"), 0)
+        with zipfile.ZipFile(self.path("old.epub")) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertIn(b"A new chapter five.", zf.read("OEBPS/Text/ch05.xhtml"))
+
+    def test_files_match_content(self):
+        image = _png(32, 48) + _IMAGE
+        xhtml = '<?xml version="1.0" encoding="utf-8"?>\n<html xmlns="http://www.w3.org/1999/xhtml"><body>' + _chapter(1) + "</body></html>"
+        with open(self.path("pic.png"), "wb") as f:
+            f.write(image)
+        with open(self.path("page.xhtml"), "w", encoding="utf-8") as f:
+            f.write(xhtml)
+        books = []
+        for name, from_files in (("content.epub", False), ("files.epub", True)):
+            with EpubWriter(self.path(name), "Title", "Author", 2025, deterministic=True) as w:
+                if from_files:
+                    w.add_image_file(self.path("pic.png"))
+                    w.add_xhtml_file(self.path("page.xhtml"))
+                else:
+                    w.add_image_content("pic.png", image, img_dims=(32, 48))
+                    w.add_xhtml_content("page", xhtml)
+                w.add_fullpage_pic("full", "pic.png")
+            with open(self.path(name), "rb") as f:
+                books.append(f.read())
+        self.assertEqual(books[0], books[1])
+
+    def compression(self, name: str, **kw) -> dict[str, zipfile.ZipInfo]:
+        with EpubWriter(self.path(name), "Title", "Author", 2025, **kw) as w:
+            for ext in ("jpg", "png", "gif", "webp"):
+                w.add_image_content(f"pic.{ext}", _IMAGE)
+            w.add_stylesheet("book", "body { margin: 1em; }\n" * 50)
+            w.add_xhtml_body("ch01", _chapter(1), title="Chapter 1")
+        with zipfile.ZipFile(self.path(name)) as zf:
+            return {info.filename.rsplit("/", 1)[-1]: info for info in zf.infolist()}
+
+    def test_compression_policy(self):
+        infos = self.compression("default.epub")
+        for name in ("pic.jpg", "pic.png", "pic.gif", "pic.webp", "mimetype"):
+            self.assertEqual(infos[name].compress_type, zipfile.ZIP_STORED, name)
+        for name in ("ch01.xhtml", "book.css", "content.opf", "nav.xhtml", "container.xml"):
+            self.assertEqual(infos[name].compress_type, zipfile.ZIP_DEFLATED, name)
+
+        fast = self.compression("fast.epub", fast=True)
+        self.assertEqual(fast["ch01.xhtml"].compress_type, zipfile.ZIP_DEFLATED)
+        self.assertEqual(fast["pic.jpg"].compress_type, zipfile.ZIP_STORED)
+        self.assertGreater(fast["ch01.xhtml"].compress_size, infos["ch01.xhtml"].compress_size)
+        with zipfile.ZipFile(self.path("fast.epub")) as zf:
+            xhtml = zf.read("OEBPS/Text/ch01.xhtml")
+        level1 = zlib.compressobj(1, zlib.DEFLATED, -15)
+        self.assertEqual(fast["ch01.xhtml"].compress_size, len(level1.compress(xhtml) + level1.flush()))
+
+        custom = self.compression("custom.epub", compression={"image/png": 6, "*": None})
+        self.assertEqual(custom["pic.png"].compress_type, zipfile.ZIP_DEFLATED)
+        self.assertEqual(custom["pic.jpg"].compress_type, zipfile.ZIP_STORED)
+        self.assertEqual(custom["ch01.xhtml"].compress_type, zipfile.ZIP_DEFLATED)  # its own entry still applies
+        for name in ("content.opf", "container.xml"):
+            self.assertEqual(custom[name].compress_type, zipfile.ZIP_STORED, name)
+
+    def test_book_id(self):
+        def book_id(name: str) -> uuid.UUID:
+            with zipfile.ZipFile(self.path(name)) as zf:
+                opf = zf.read("OEBPS/content.opf").decode("utf-8")
+            return uuid.UUID(re.search(r"urn:uuid:([0-9a-f-]+)", opf)[1])
+        self.build("one.epub", deterministic=True)
+        self.build("two.epub", deterministic=True)
+        self.build("changed.epub", {5: "<p>Changed.</p>"}, deterministic=True)
+        self.assertEqual(book_id("one.epub").version, 5)
+        self.assertEqual(book_id("one.epub"), book_id("two.epub"))
+        self.assertNotEqual(book_id("one.epub"), book_id("changed.epub"))
+
+    def test_failed_rebuild_keeps_previous(self):
+        old = self.build("book.epub", deterministic=True)
+        with self.assertRaises(Exception):
+            # no chapters, so close() fails with an empty spine
+            with EpubWriter(self.path("book.epub"), "Title", "Author", 2025, previous=self.path("book.epub")):
+                pass
+        with self.assertRaises(RuntimeError):
+            # the book itself could be finished, but its contents stopped arriving
+            with EpubWriter(self.path("book.epub"), "Title", "Author", 2025, previous=self.path("book.epub"), workers=2) as w:
+                w.add_xhtml_body("ch00", _chapter(0), title="Chapter 0")
+                raise RuntimeError("interrupted")
+        self.assertEqual(os.listdir(self.tmpdir.name), ["book.epub"])
+        with open(self.path("book.epub"), "rb") as f:
+            self.assertEqual(f.read(), old)
+
+    def test_modified_needs_deterministic(self):
+        import datetime
+        with self.assertRaises(ValueError):
+            EpubWriter(self.path("book.epub"), "Title", "Author", 2025, modified=datetime.datetime(2025, 6, 1))
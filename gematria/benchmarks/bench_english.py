@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Measure words/sec for Cipher.sum, sum_many, add_to_lexicon and print_synonyms (stdlib only).
+
+Corpora are synthetic: random words of 2-12 letters, either all lowercase ASCII
+or mixed-case, at sizes from 10^4 up to 10^7 words (see --max-exp).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import string
+import time
+from collections.abc import Callable
+
+from rwt_gematria import Cipher
+
+ALPHABETS = {
+    "ascii": string.ascii_lowercase,
+    "mixed-case": string.ascii_letters,
+}
+
+
+def make_corpus(count: int, alphabet: str, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choices(alphabet, k=rng.randint(2, 12))) for _ in range(count)]
+
+
+def words_per_sec(count: int, fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return count / max(time.perf_counter() - start, 1e-9)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--cipher", default="alw", help="builtin cipher name (default: alw)")
+    p.add_argument("--min-exp", type=int, default=4, help="smallest corpus is 10^N words (default: 4)")
+    p.add_argument("--max-exp", type=int, default=6, help="largest corpus is 10^N words (default: 6)")
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args()
+
+    print(f"{'corpus':>10} {'words':>10} {'sum':>12} {'sum_many':>12} {'add_to_lex':>12} {'synonyms':>12}  (words/sec)")
+    for name, alphabet in ALPHABETS.items():
+        for exp in range(args.min_exp, args.max_exp + 1):
+            count = 10**exp
+            words = make_corpus(count, alphabet, args.seed)
+            cipher = Cipher(args.cipher)
+            rates = [
+                words_per_sec(count, lambda: [cipher.sum(w) for w in words]),
+                words_per_sec(count, lambda: cipher.sum_many(words)),
+                words_per_sec(count, lambda: cipher.add_to_lexicon(words)),
+            ]
+            with open(os.devnull, "w") as null:
+                rates.append(words_per_sec(count, lambda: cipher.print_synonyms(null)))
+            print(f"{name:>10} {count:>10} " + " ".join(f"{r:>12,.0f}" for r in rates))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
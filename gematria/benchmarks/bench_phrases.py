@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Time Cipher.find_phrases over a synthetic 100k-word vocabulary (stdlib only)."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import time
+
+from rwt_gematria import Cipher
+
+
+def make_vocabulary(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    words: set[str] = set()
+    while len(words) < count:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 12))))
+    return sorted(words)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--words", type=int, default=100_000, help="vocabulary size (default: 100000)")
+    p.add_argument("--cipher", default="alw", help="builtin cipher name (default: alw)")
+    p.add_argument("--limit", type=int, default=1000, help="phrases to take per limited run (default: 1000)")
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args()
+
+    cipher = Cipher(args.cipher)
+    start = time.perf_counter()
+    cipher.add_to_lexicon(make_vocabulary(args.words, args.seed))
+    print(f"lexicon of {args.words} words: {time.perf_counter() - start:.2f}s")
+
+    for target in (93, 418, 777):
+        for max_words in (2, 3):
+            start = time.perf_counter()
+            first = next(iter(cipher.find_phrases(target, max_words)), None)
+            to_first = time.perf_counter() - start
+            start = time.perf_counter()
+            found = sum(1 for _ in cipher.find_phrases(target, max_words, limit=args.limit))
+            elapsed = time.perf_counter() - start
+            print(
+                f"target {target:4d}, up to {max_words} words: first {to_first * 1000:8.2f}ms {first}, "
+                f"{found} phrases in {elapsed * 1000:8.2f}ms"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,4 +1,4 @@
 from . import english
-from .english import Cipher
+from .english import Cipher, CipherBank
 
-__all__ = ["Cipher", "english"]
\ No newline at end of file
+__all__ = ["Cipher", "CipherBank", "english"]
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""Letter values for the Hebrew and Greek builtin ciphers.
+
+The tables are computed once, at import.  Besides the plain letters, they
+cover every precomposed character in the scripts' blocks (accented Greek,
+Hebrew presentation forms, ligatures), valued as the sum of the letters it
+decomposes into.  Combining marks (niqqud, accents, breathings) are given
+the value 0, so they stay inside words but never need a separate
+normalization pass to strip them.
+"""
+import unicodedata as _unicodedata
+
+_hebrew_letters = {
+  'א': 1, 'ב': 2, 'ג': 3, 'ד': 4, 'ה': 5, 'ו': 6, 'ז': 7, 'ח': 8, 'ט': 9,
+  'י': 10, 'כ': 20, 'ך': 20, 'ל': 30, 'מ': 40, 'ם': 40, 'נ': 50, 'ן': 50,
+  'ס': 60, 'ע': 70, 'פ': 80, 'ף': 80, 'צ': 90, 'ץ': 90,
+  'ק': 100, 'ר': 200, 'ש': 300, 'ת': 400,
+  'װ': 12, # vav-vav ligature
+  'ױ': 16, # vav-yod ligature
+  'ײ': 20, # yod-yod ligature
+}
+
+_greek_letters = {
+  'α': 1, 'β': 2, 'γ': 3, 'δ': 4, 'ε': 5,
+  'ϝ': 6, 'ϛ': 6, # digamma, stigma
+  'ζ': 7, 'η': 8, 'θ': 9, 'ι': 10, 'κ': 20, 'λ': 30, 'μ': 40, 'ν': 50,
+  'ξ': 60, 'ο': 70, 'π': 80,
+  'ϙ': 90, 'ϟ': 90, # archaic koppa, koppa
+  'ρ': 100, 'σ': 200, 'ς': 200, 'ϲ': 200, 'τ': 300, 'υ': 400, 'φ': 500,
+  'χ': 600, 'ψ': 700, 'ω': 800,
+  'ϡ': 900, # sampi
+}
+_greek_letters.update({ ch.upper(): v for ch,v in _greek_letters.items() if ch.upper() != ch })
+
+def _script_values(letters: dict[str,int], blocks: list[range]) -> dict[str,int]:
+  """Extend LETTERS with the combining marks (as 0) and decomposable characters in BLOCKS."""
+  values = dict(letters)
+  for block in blocks:
+    for cp in block:
+      ch = chr(cp)
+      if ch not in values and _unicodedata.category(ch).startswith('M'):
+        values[ch] = 0
+  def value_of(ch: str) -> int|None:
+    if ch in values:
+      return values[ch]
+    parts = _unicodedata.decomposition(ch).split()
+    if parts and parts[0].startswith('<'):
+      parts = parts[1:]
+    if not parts:
+      return None
+    total = 0
+    for part in parts:
+      v = value_of(chr(int(part, 16)))
+      if v is None:
+        return None
+      total += v
+    return total
+  for block in blocks:
+    for cp in block:
+      ch = chr(cp)
+      if ch not in values and _unicodedata.category(ch).startswith('L'):
+        v = value_of(ch)
+        if v is not None:
+          values[ch] = v
+  return values
+
+hebrew = _script_values(_hebrew_letters, [range(0x0591, 0x0600), range(0xfb1d, 0xfb50)])
+greek = _script_values(_greek_letters, [range(0x0300, 0x0370), range(0x0370, 0x0400), range(0x1f00, 0x2000)])
@@ -0,0 +1,98 @@
+"""A compact, sorted, memory-mappable file format for a Cipher's lexicon.
+
+The file is a fixed header followed by five native-endian arrays:
+
+  sums          int64[n_sums]        distinct sums, ascending
+  offsets       uint64[n_sums+1]     start of each sum's run in `ids`
+  ids           uint32[n_entries]    word ids, grouped by sum (padded to 8 bytes)
+  word_offsets  uint64[n_words+1]    start of each word in `heap`
+  heap          bytes[heap_len]      every distinct word, utf-8, back to back
+
+Finding the words for a sum is a bisect over `sums`, so with mmap only a few
+pages of the file are ever touched.
+"""
+import mmap as _mmap
+import struct as _struct
+import sys as _sys
+from array import array as _array
+from bisect import bisect_left as _bisect_left
+from typing import BinaryIO as _binaryio, Iterable as _iterable, Iterator as _iterator
+
+_MAGIC = b'RWTGLEX' + (b'L' if _sys.byteorder == 'little' else b'B')
+_HEADER = _struct.Struct('<8sQQQQ') # magic, n_sums, n_entries, n_words, heap_len
+
+def write_index(f: _binaryio, groups: _iterable[tuple[int,_iterable[str]]]):
+  """Write GROUPS, pairs of (sum, words) in ascending order of sum, to the binary file F."""
+  sums, offsets, ids = _array('q'), _array('Q', [0]), _array('I')
+  word_offsets, heap = _array('Q', [0]), bytearray()
+  word_ids : dict[str,int] = {}
+  for total,words in groups:
+    sums.append(total)
+    for w in sorted(words):
+      wid = word_ids.get(w)
+      if wid is None:
+        wid = word_ids[w] = len(word_ids)
+        heap += w.encode('utf-8')
+        word_offsets.append(len(heap))
+      ids.append(wid)
+    offsets.append(len(ids))
+  n_entries = len(ids)
+  if n_entries % 2: ids.append(0)
+  f.write(_HEADER.pack(_MAGIC, len(sums), n_entries, len(word_ids), len(heap)))
+  for arr in (sums, offsets, ids, word_offsets):
+    f.write(memoryview(arr))
+  f.write(heap)
+
+class LexiconIndex:
+  """A read-only view of a lexicon written by `write_index`, over any buffer holding it."""
+
+  @classmethod
+  def open(cls, path, use_mmap: bool = True) -> 'LexiconIndex':
+    """Open the index in the file at PATH, either mapping it or reading it all into memory."""
+    with open(path, 'rb') as f:
+      try:
+        return cls(_mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ) if use_mmap else f.read())
+      except ValueError as e:
+        raise ValueError(f'{path} is not a lexicon index for this machine!') from e
+
+  def __init__(self, buf):
+    self._buf = buf
+    mv = memoryview(buf)
+    if len(mv) < _HEADER.size or mv[:8] != _MAGIC:
+      raise ValueError('Not a lexicon index for this machine!')
+    _, n_sums, n_entries, n_words, heap_len = _HEADER.unpack_from(mv)
+    pos = _HEADER.size
+    def take(fmt: str, count: int) -> memoryview:
+      nonlocal pos
+      size = count * _struct.calcsize(fmt)
+      view = mv[pos:pos+size].cast(fmt)
+      pos += size
+      return view
+    self.sums = take('q', n_sums)
+    self._offsets = take('Q', n_sums + 1)
+    self._ids = take('I', n_entries + n_entries % 2)
+    self._word_offsets = take('Q', n_words + 1)
+    self._heap = mv[pos:pos+heap_len]
+
+  def __len__(self) -> int:
+    return len(self.sums)
+
+  def word(self, wid: int) -> str:
+    """The word with id WID."""
+    return str(self._heap[self._word_offsets[wid]:self._word_offsets[wid+1]], 'utf-8')
+
+  def count_at(self, pos: int) -> int:
+    """The number of words for the POS-th smallest sum."""
+    return self._offsets[pos+1] - self._offsets[pos]
+
+  def words_at(self, pos: int) -> _iterator[str]:
+    """The words for the POS-th smallest sum."""
+    for i in range(self._offsets[pos], self._offsets[pos+1]):
+      yield self.word(self._ids[i])
+
+  def words(self, total: int) -> list[str]:
+    """The words which sum to TOTAL, found by bisection."""
+    pos = _bisect_left(self.sums, total)
+    if pos == len(self.sums) or self.sums[pos] != total:
+      return []
+    return list(self.words_at(pos))
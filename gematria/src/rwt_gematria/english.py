@@ -1,9 +1,20 @@
+import codecs as _codecs
+import io as _io
+import os as _os
 import string as _string
+import tempfile as _tempfile
 import itertools as _itertools
+from itertools import repeat as _repeat
+import re as _re
+from array import array as _array
+from bisect import bisect_left as _bisect_left, bisect_right as _bisect_right, insort as _insort
 from collections import defaultdict as _defaultdict
-from typing import Iterable as _iterable, List as _list
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
+from typing import Iterable as _iterable, Iterator as _iterator, List as _list, Sequence as _sequence
+from . import _isopsephy
+from ._lexicon import LexiconIndex as _LexiconIndex, write_index as _write_index
 
-__all__ = ['Cipher']
+__all__ = ['Cipher', 'CipherBank']
 
 _named : dict[str,_iterable[int]] = {
   'alw': 
@@ -22,54 +33,435 @@ _named : dict[str,_iterable[int]] = {
     [5, 20, 2, 23, 13, 12, 11, 3, 0, 7, 17, 1, 21, 24, 10, 4, 16, 14, 15, 9, 25, 22, 8, 6, 18, 19]
 }
 
+# How many words `add_to_lexicon` sums at once
+_ADD_BATCH = 1 << 14
+
+# Stands in for the translation table of a cipher that can't have one, so it isn't rebuilt
+_NO_TRANSLATION : dict[int,str|None] = {}
+
+def _byte_table_for(code: dict[str,int]) -> bytes|None:
+  """Build a 256-byte `bytes.translate` table giving each latin-1 character its value in CODE
+  (0 for non-letters), for summing words encoded with `encode('latin-1','ignore')`.  This is
+  the fast case, so returns None unless every letter is latin-1 with a value from 0 to 255."""
+  table = bytearray(256)
+  for k,v in code.items():
+    if len(k) != 1: continue
+    if ord(k) > 255 or not 0 <= v <= 255: return None
+    table[ord(k)] = v
+  return bytes(table)
+
+def _translation_for(code: dict[str,int]) -> dict[int,str|None]|None:
+  """Build a `str.translate` table that turns each letter of CODE into latin-1 characters
+  whose byte values add up to the letter's value.  Every other latin-1 character is deleted,
+  and anything outside latin-1 is dropped by `encode('latin-1','ignore')`, so summing the
+  resulting bytes gives the cipher sum without a Python-level loop.  Returns None when
+  the cipher has negative values, which can't be expressed this way."""
+  table : dict[int,str|None] = { cp: None for cp in range(256) }
+  for k,v in code.items():
+    if len(k) != 1: continue
+    if v < 0: return None
+    table[ord(k)] = '\xff' * (v // 255) + chr(v % 255)
+  return table
+
+def _dense_table(code: dict[str,int]) -> _array:
+  """Build a lookup table indexed by codepoint, with one extra trailing 0 for every
+  codepoint beyond the cipher's letters."""
+  letters = { ord(k): v for (k,v) in code.items() if len(k) == 1 }
+  table = _array('l', bytes(_array('l').itemsize * (max(letters, default=0) + 2)))
+  for cp,v in letters.items():
+    table[cp] = v
+  return table
+
+def _np_word_sums(np, table, words: _sequence[str]):
+  """Look up every character of WORDS in TABLE (indexed by codepoint, with a trailing row of
+  zeros for everything else) and total the rows for each word."""
+  codes = np.frombuffer(''.join(words).encode('utf-32-le'), dtype=np.uint32)
+  values = table[np.minimum(codes, len(table) - 1)]
+  totals = np.zeros((len(values) + 1,) + table.shape[1:], dtype=np.int64)
+  np.cumsum(values, axis=0, out=totals[1:])
+  lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+  ends = np.cumsum(lengths)
+  return totals[ends] - totals[ends - lengths]
+
+def _read_shard(path, start: int, end: int, encoding: str, piece: int = 1 << 20) -> _iterator[str]:
+  """Decode the lines of the file at PATH which begin in the byte range [START, END).  Cutting at
+  line breaks keeps words whole, and a newline byte can't be part of a multibyte character."""
+  decoder = _codecs.getincrementaldecoder(encoding)()
+  with open(path, 'rb') as f:
+    if start > 0:
+      f.seek(start - 1)
+      f.readline() # the line running into START belongs to the previous shard
+    pos, data = f.tell(), b''
+    while pos < end:
+      data = f.read(min(piece, end - pos))
+      if not data: break
+      pos += len(data)
+      yield decoder.decode(data)
+    if data and not data.endswith(b'\n'):
+      yield decoder.decode(f.readline())
+    yield decoder.decode(b'', final=True)
+
+def _build_shard(code: dict[str,int], path, start: int, end: int, encoding: str) -> bytes:
+  """Worker for `Cipher.build_lexicon_parallel`: build the lexicon for one shard of a file, and
+  return it in the compact index format rather than as pickled sets of strings."""
+  cipher = Cipher(code)
+  cipher.ingest_stream(_read_shard(path, start, end, encoding))
+  buf = _io.BytesIO()
+  _write_index(buf, cipher._lexicon_groups())
+  return buf.getvalue()
+
+# the non-english ciphers are complete tables rather than values for the ascii letters
+_named_tables : dict[str,dict[str,int]] = {
+  'hebrew': _isopsephy.hebrew,
+  'greek': _isopsephy.greek,
+}
+# ... and their base letters, which is all `describe` lists for them
+_named_table_letters : dict[str,dict[str,int]] = {
+  'hebrew': _isopsephy._hebrew_letters,
+  'greek': _isopsephy._greek_letters,
+}
+
 class Cipher:
   @staticmethod
   def builtin_ciphers() -> _list[str]:
     """Get a list of all pre-defined cipher names which can be used to create a Cipher"""
-    return list(_named)
+    return list(_named) + list(_named_tables)
 
   def __init__(self, dictionary: str|dict[str,int]):
     """Create a Cipher with either a name of a pre-defined cipher, or with a dict from letters
     to numeric values."""
-    if isinstance(dictionary,str):
+    self._base_letters : dict[str,int]|None = None
+    if isinstance(dictionary,str) and dictionary in _named_tables:
+      self._base_letters = _named_table_letters[dictionary]
+      dictionary = dict(_named_tables[dictionary])
+    elif isinstance(dictionary,str):
       values = _named[dictionary]
       # todo.. throw error if not found!
       dictionary = { k: v for (k,v) in zip(_string.ascii_letters, _itertools.cycle(values)) }
       dictionary['-'] = dictionary["'"] = 0
     self._code = dictionary
     self._lexicon : _defaultdict[int,set[str]] = _defaultdict(set)
+    self._sorted_sums = _array('q') # the keys of _lexicon, in order
+    self._translation : bytes|dict[int,str|None]|None = None
+    self._table : _array|None = None
+    self._token_rx : _re.Pattern[str]|None = None
+    self._index : _LexiconIndex|None = None
 
   def sum(self, word):
     """Compute the sum for a string, according to the cipher."""
     return sum(self._code.get(ch,0) for ch in word)
 
+  def sum_many(self, words: _iterable[str]) -> _array:
+    """Compute the sum for every string in WORDS, returning an array('l') of the results.
+    The cipher is compiled into a translation table on first use, so each word is summed
+    without a per-character dict lookup: a byte table when all the letters and values fit
+    in a byte (as for every english builtin), else a `str.translate` table."""
+    if self._translation is None:
+      xlat = _byte_table_for(self._code) or _translation_for(self._code)
+      self._translation = _NO_TRANSLATION if xlat is None else xlat
+    xlat = self._translation
+    if xlat is _NO_TRANSLATION:
+      return _array('l', map(self.sum, words))
+    if isinstance(xlat, bytes):
+      return _array('l', (sum(w.encode('latin-1','ignore').translate(xlat)) for w in words))
+    return _array('l', (sum(w.translate(xlat).encode('latin-1','ignore')) for w in words))
+
+  def sum_text_array(self, words: _sequence[str]):
+    """Compute the sum for every string in WORDS with NumPy, returning an int64 ndarray.
+    The words are converted to one array of codepoints, looked up in a dense table
+    of the cipher's values, and summed per word.  Requires NumPy."""
+    import numpy as np
+    if self._table is None:
+      self._table = _dense_table(self._code)
+    table = np.frombuffer(self._table, dtype=np.dtype(f'i{self._table.itemsize}')).astype(np.int64)
+    return _np_word_sums(np, table, words)
+
   def describe(self, file=None):
-    """Print out a description of the cipher to the desired file (defaults to sys.stdout)."""
-    count = 0
-    for uc in _string.ascii_uppercase:
-      count += 1
-      val,lcval = self._code.get(uc,0), self._code.get(uc.lower(),0)
-      vstr = str(val) if val == lcval else f'{val}/{lcval}'
-      print(f'{uc}: {vstr}', file=file, end='\n' if count % 5 == 0 else '\t')
-    for nonlet,val in (item for item in self._code.items() if not (item[0].isascii() and item[0].isalpha())):
-      count += 1
-      print(f'{nonlet}: {val}', file=file, end='\n' if count % 5 == 0 else '\t')
-    if count % 5 != 0:
-      print(file=file)
+    """Print out a description of the cipher to the desired file (defaults to sys.stdout).
+    The hebrew and greek builtins list only their base letters, not every mark and
+    precomposed character they also cover."""
+    if self._base_letters is not None:
+      entries = [f'{ch}: {val}' for ch,val in self._base_letters.items() if ch == ch.lower()]
+    else:
+      entries = []
+      for uc in _string.ascii_uppercase:
+        val,lcval = self._code.get(uc,0), self._code.get(uc.lower(),0)
+        entries.append(f'{uc}: {val}' if val == lcval else f'{uc}: {val}/{lcval}')
+      for nonlet,val in (item for item in self._code.items() if not (item[0].isascii() and item[0].isalpha())):
+        entries.append(f'{nonlet}: {val}')
+    for i in range(0, len(entries), 5):
+      print('\t'.join(entries[i:i+5]), file=file)
 
   def add_to_lexicon(self, words: _iterable[str]):
-    """Add sums for every given word in WORDS to the dict in LEXICON"""
-    for w in words:
-      self._lexicon[self.sum(w)].add(w)
+    """Add sums for every given word in WORDS to the dict in LEXICON.  WORDS is summed
+    a batch at a time, so a generator of any length is consumed in constant memory."""
+    lexicon = self._lexicon
+    known = len(lexicon)
+    for batch in _itertools.batched(words, _ADD_BATCH):
+      for w,total in zip(batch, self.sum_many(batch)):
+        lexicon[total].add(w)
+    if len(lexicon) != known:
+      self._add_sorted_sums(known)
+
+  def _add_sorted_sums(self, known: int):
+    """Bring `_sorted_sums` up to date with the keys added to `_lexicon` after the first KNOWN
+    (dicts keep insertion order, and keys are never removed)."""
+    sums = self._sorted_sums
+    new = sorted(_itertools.islice(self._lexicon, known, None))
+    if len(new) * 8 < len(sums):
+      for num in new:
+        _insort(sums, num)
+    else:
+      self._sorted_sums = _array('q', sorted(self._lexicon))
 
   def split_into_lexicon(self, text):
     """Split words based on each character's presence in the Cipher, and add each of the words to this
     cipher's lexicon"""
-    self.add_to_lexicon(text.split()) # todo, split using actual Cipher
+    self.ingest_stream((text,))
+
+  def _tokenizer(self) -> _re.Pattern[str]:
+    """A regex matching runs of characters which are letters of this cipher."""
+    if self._token_rx is None:
+      letters = sorted(k for k in self._code if len(k) == 1)
+      self._token_rx = _re.compile(f"[{''.join(_re.escape(ch) for ch in letters)}]+" if letters else r'(?!)')
+    return self._token_rx
+
+  def ingest_stream(self, chunks: _iterable[str]):
+    """Split the text in CHUNKS (any iterable of strings, e.g. an open text file) into words
+    made of this cipher's letters, and add them to the lexicon.  A word that straddles two
+    chunks is carried over, so only about one chunk is held in memory at a time."""
+    rx = self._tokenizer()
+    carry = ''
+    for chunk in chunks:
+      if not chunk: continue
+      text = carry + chunk
+      words = rx.findall(text)
+      carry = ''
+      if words and text.endswith(words[-1]):
+        carry = words.pop()
+      self.add_to_lexicon(words)
+    if carry:
+      self.add_to_lexicon((carry,))
+
+  def ingest_file(self, path, encoding: str = 'utf-8', chunk_size: int = 1 << 20):
+    """Add every word in the file at PATH to the lexicon, reading CHUNK_SIZE characters at a time.
+    See `ingest_stream`."""
+    with open(path, encoding=encoding) as f:
+      self.ingest_stream(iter(lambda: f.read(chunk_size), ''))
+
+  def _lexicon_slots(self, lo: int|None = None, hi: int|None = None) -> _iterator[tuple[int,set[str]|None,int|None]]:
+    """Every distinct sum from LO to HI (inclusive) in the lexicon, in ascending order, along with
+    its words in memory (or None) and its position in the loaded index (or None).  The bounds
+    are found by bisection, and the in-memory and index sums are merged from there."""
+    lexicon, index, in_memory = self._lexicon, self._index, self._sorted_sums
+    i = 0 if lo is None else _bisect_left(in_memory, lo)
+    i_end = len(in_memory) if hi is None else _bisect_right(in_memory, hi)
+    if index is not None:
+      pos_end = len(index) if hi is None else _bisect_right(index.sums, hi)
+      for pos in range(0 if lo is None else _bisect_left(index.sums, lo), pos_end):
+        num = index.sums[pos]
+        while i < i_end and in_memory[i] < num:
+          yield in_memory[i], lexicon[in_memory[i]], None
+          i += 1
+        if i < i_end and in_memory[i] == num:
+          yield num, lexicon[num], pos
+          i += 1
+        else:
+          yield num, None, pos
+    for num in in_memory[i:i_end]:
+      yield num, lexicon[num], None
+
+  def build_lexicon_parallel(self, paths: _iterable[str], workers: int|None = None,
+                             encoding: str = 'utf-8', shard_size: int = 64 << 20):
+    """Add every word in the files at PATHS to the lexicon, like `ingest_file`, but spread over
+    WORKERS processes (default: one per CPU).  Files are cut into shards of about SHARD_SIZE
+    bytes at line breaks.  Each worker sends back its partial lexicon in the compact format of
+    `save_lexicon`, and those are merged here in order of sum."""
+    shards = []
+    for path in paths:
+      size = _os.path.getsize(path)
+      shards.extend((path, start, min(start + shard_size, size)) for start in range(0, max(size, 1), shard_size))
+    if workers is None:
+      workers = _os.cpu_count() or 1
+    if workers <= 1 or len(shards) <= 1:
+      for path,start,end in shards:
+        self.ingest_stream(_read_shard(path, start, end, encoding))
+      return
+    lexicon, known = self._lexicon, len(self._lexicon)
+    with _ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+      args = zip(*((self._code, path, start, end, encoding) for path,start,end in shards))
+      for buf in pool.map(_build_shard, *args):
+        partial = _LexiconIndex(buf)
+        for pos,num in enumerate(partial.sums):
+          lexicon[num].update(partial.words_at(pos))
+    if len(lexicon) != known:
+      self._add_sorted_sums(known)
+
+  def _lexicon_groups(self, lo: int|None = None, hi: int|None = None) -> _iterator[tuple[int,_iterable[str]]]:
+    """Every (sum, words) pair in the lexicon from LO to HI, in ascending order of sum.  Words in
+    a loaded index are streamed from it, and merged with any words added in memory since."""
+    for num,words,pos in self._lexicon_slots(lo, hi):
+      if pos is None:
+        yield num, words
+      elif words is None:
+        yield num, self._index.words_at(pos)
+      else:
+        yield num, words.union(self._index.words_at(pos))
+
+  def words_for(self, value: int) -> set[str]:
+    """Get the words in the lexicon which sum to VALUE."""
+    words = set(self._lexicon.get(value, ()))
+    if self._index is not None:
+      words.update(self._index.words(value))
+    return words
+
+  def save_lexicon(self, path):
+    """Save the lexicon to PATH in a compact, sorted format which `load_lexicon` can map.
+    It's written to a temporary file beside PATH which then replaces it, since the words
+    may be streaming from PATH itself (when it's the mapped index)."""
+    fd, tmp = _tempfile.mkstemp(dir=_os.path.dirname(_os.path.abspath(path)), suffix='.tmp')
+    try:
+      with open(fd, 'wb') as f:
+        _write_index(f, self._lexicon_groups())
+      _os.replace(tmp, path)
+    except BaseException:
+      _os.unlink(tmp)
+      raise
+
+  def load_lexicon(self, path, mmap: bool = True):
+    """Replace the lexicon with one saved by `save_lexicon` (with the same cipher!).  With MMAP,
+    the file is mapped and searched in place, and only words added afterwards are held in
+    memory.  Otherwise, the whole lexicon is read into memory."""
+    index = _LexiconIndex.open(path, use_mmap=mmap)
+    self._lexicon = _defaultdict(set)
+    self._sorted_sums = _array('q')
+    self._index = None
+    if mmap:
+      self._index = index
+    else:
+      for pos,num in enumerate(index.sums):
+        self._lexicon[num].update(index.words_at(pos))
+      self._sorted_sums = _array('q', index.sums)
+
+  def words_in_range(self, lo: int, hi: int) -> _iterator[tuple[int,set[str]]]:
+    """Generate (sum, words) pairs for every sum in the lexicon from LO to HI (inclusive), in order."""
+    return ((num, set(words)) for num,words in self._lexicon_groups(lo, hi))
+
+  def nearest(self, value: int, k: int = 1) -> list[tuple[int,set[str]]]:
+    """Get (sum, words) pairs for the K sums in the lexicon closest to VALUE, closest first
+    (the smaller sum wins a tie)."""
+    candidates = set()
+    for sums in (self._sorted_sums, self._index.sums if self._index is not None else ()):
+      pos = _bisect_left(sums, value)
+      candidates.update(sums[max(pos - k, 0):pos + k])
+    closest = sorted(candidates, key=lambda num: (abs(num - value), num))[:k]
+    return [(num, self.words_for(num)) for num in closest]
+
+  def histogram(self, bin_width: int = 1, lo: int|None = None, hi: int|None = None) -> list[tuple[int,int]]:
+    """Count the words in the lexicon by sum, from LO to HI (inclusive), in bins of BIN_WIDTH sums.
+    Returns (bin start, count) pairs for the non-empty bins, in order.  Counts come from the
+    set sizes and the index offsets, so words are only decoded where the two overlap."""
+    counts : dict[int,int] = {}
+    for num,words,pos in self._lexicon_slots(lo, hi):
+      if pos is None:
+        count = len(words)
+      elif words is None:
+        count = self._index.count_at(pos)
+      else:
+        count = len(words.union(self._index.words_at(pos)))
+      start = num - num % bin_width
+      counts[start] = counts.get(start, 0) + count
+    return list(counts.items())
+
+  def find_phrases(self, target: int, max_words: int = 3, limit: int|None = None) -> _iterator[tuple[str,...]]:
+    """Generate phrases of up to MAX_WORDS distinct lexicon words whose sums total TARGET,
+    stopping after LIMIT phrases (if given).  Shorter phrases come first.  The search runs
+    over the sorted distinct sums rather than the words: sums are picked in non-decreasing
+    order within bisected bounds, and the last one is found by a hash lookup."""
+    sums = [num for num,_,_ in self._lexicon_slots()]
+    present = set(sums)
+    word_lists : dict[int,list[str]] = {}
+
+    def sum_combos(total: int, count: int, start: int) -> _iterator[tuple[int,...]]:
+      if count == 1:
+        if total in present and total >= sums[start]:
+          yield (total,)
+        return
+      # every later sum is at least this one, and at most the largest sum
+      lo = _bisect_left(sums, total - (count - 1) * sums[-1], lo=start)
+      hi = _bisect_right(sums, total // count, lo=start)
+      for i in range(lo, hi):
+        for rest in sum_combos(total - sums[i], count - 1, i):
+          yield (sums[i],) + rest
+
+    def phrases() -> _iterator[tuple[str,...]]:
+      for count in range(1, max_words + 1) if sums else ():
+        for combo in sum_combos(target, count, 0):
+          choices = []
+          for num,group in _itertools.groupby(combo):
+            if num not in word_lists:
+              word_lists[num] = sorted(self.words_for(num))
+            choices.append(_itertools.combinations(word_lists[num], len(list(group))))
+          for picked in _itertools.product(*choices):
+            yield tuple(_itertools.chain.from_iterable(picked))
+
+    return _itertools.islice(phrases(), limit)
 
   def print_synonyms(self,file=None):
     """print out a formatted dictionary of synonyms."""
-    for num in sorted(self._lexicon):
+    for num,words in self._lexicon_groups():
       print(f"{num}:",file=file)
-      for word in self._lexicon[num]:
+      for word in words:
         print(f"  {word}",file=file)
+
+_FIELD_BITS = 64
+_FIELD_MASK = (1 << _FIELD_BITS) - 1
+_FIELD_HALF = 1 << (_FIELD_BITS - 1)
+
+class CipherBank:
+  """A stack of ciphers which are all computed at once.  Each character maps to one integer
+  holding its value under every cipher, in separate 64-bit fields, so a single pass over a
+  word adds up all of its sums together."""
+
+  def __init__(self, ciphers: _iterable[str|Cipher]|None = None):
+    """Create a CipherBank from names of pre-defined ciphers and/or Cipher objects.  By default,
+    every builtin cipher is included, in the order of `Cipher.builtin_ciphers()`."""
+    if ciphers is None:
+      ciphers = Cipher.builtin_ciphers()
+    self.ciphers = [c if isinstance(c, Cipher) else Cipher(c) for c in ciphers]
+    self._packed : dict[str,int] = {}
+    for field,c in enumerate(self.ciphers):
+      for k,v in c._code.items():
+        if len(k) == 1:
+          self._packed[k] = self._packed.get(k,0) + (v << (_FIELD_BITS * field))
+    # adding HALF to every field keeps negative sums from borrowing across fields
+    self._bias = sum(_FIELD_HALF << (_FIELD_BITS * field) for field in range(len(self.ciphers)))
+    self._matrix = None
+
+  def __len__(self) -> int:
+    return len(self.ciphers)
+
+  def sums(self, word: str) -> tuple[int,...]:
+    """Compute the sum for a string under every cipher in the bank."""
+    packed = sum(map(self._packed.get, word, _repeat(0))) + self._bias
+    return tuple(((packed >> (_FIELD_BITS * field)) & _FIELD_MASK) - _FIELD_HALF for field in range(len(self.ciphers)))
+
+  def sum_many(self, words: _iterable[str]) -> list[_array]:
+    """Compute the sums for every string in WORDS under every cipher in the bank.  The result
+    has one array('q') per cipher (in the order of `ciphers`), with one sum per word."""
+    get, bias = self._packed.get, self._bias
+    totals = [sum(map(get, w, _repeat(0))) + bias for w in words]
+    return [_array('q', [((t >> shift) & _FIELD_MASK) - _FIELD_HALF for t in totals])
+            for shift in range(0, _FIELD_BITS * len(self.ciphers), _FIELD_BITS)]
+
+  def sum_text_array(self, words: _sequence[str]):
+    """Compute the sums for every string in WORDS with NumPy, returning an int64 ndarray
+    with one row per word and one column per cipher.  Requires NumPy."""
+    import numpy as np
+    if self._matrix is None:
+      tables = [_dense_table(c._code) for c in self.ciphers]
+      matrix = np.zeros((max(map(len, tables), default=1), len(tables)), dtype=np.int64)
+      for col,table in enumerate(tables):
+        matrix[:len(table)-1, col] = table[:-1]
+      self._matrix = matrix
+    return _np_word_sums(np, self._matrix, words)
@@ -1,9 +1,20 @@
 # testing english qabalah
 # Run from the directory with pypackage.toml as:
 #   python3 -m unittest discover -s tests
+import os
+import tempfile
+import io
 import unittest
+from unittest import mock
 from rwt_gematria import english as eq
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_WORDS = ['one', 'woman', 'Life', "Jesus'", '', 'x-ray', 'caf\u00e9', '\u05d0\u05d1', 'a b c', '99']
+
 class TestALW(unittest.TestCase):
     def test_love(self):
         alw = eq.Cipher('alw')
@@ -17,4 +28,220 @@ class TestSimple(unittest.TestCase):
         smp = eq.Cipher('simple')
         self.assertEqual(1,smp.sum('a'))
         self.assertEqual(26,smp.sum('Z'))
-        self.assertEqual(10,smp.sum('abcd'))
\ No newline at end of file
+        self.assertEqual(10,smp.sum('abcd'))
+
+class TestSumMany(unittest.TestCase):
+    def test_matches_sum(self):
+        for name in eq.Cipher.builtin_ciphers():
+            c = eq.Cipher(name)
+            self.assertEqual([c.sum(w) for w in _WORDS], list(c.sum_many(_WORDS)))
+
+    def test_large_and_negative_values(self):
+        for code in ({'a': 1000, 'b': 255, '\u05d0': 510}, {'a': 5, 'b': -3}):
+            c = eq.Cipher(code)
+            words = ['aab', 'ba\u05d0', '', 'zzz']
+            self.assertEqual([c.sum(w) for w in words], list(c.sum_many(words)))
+
+    def test_byte_table_for_english(self):
+        for name in ('alw', 'simple', 'trigrammaton'):
+            self.assertIsNotNone(eq._byte_table_for(eq.Cipher(name)._code))
+        for code in ({'a': 256}, {'\u05d0': 1}, {'a': -1}):
+            self.assertIsNone(eq._byte_table_for(code))
+        c = eq.Cipher({'a': 255, '\u00e9': 7, 'b': 0})
+        self.assertEqual([262, 255, 0], list(c.sum_many(['a\u00e9b', 'a\u05d0', 'xyz'])))
+
+    def test_no_table_is_cached(self):
+        c = eq.Cipher({'a': 5, 'b': -3})
+        with mock.patch.object(eq, '_translation_for', wraps=eq._translation_for) as build:
+            for _ in range(3):
+                self.assertEqual([7, -6], list(c.sum_many(['aab', 'bb'])))
+        self.assertEqual(1, build.call_count)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_matches_sum(self):
+        for code in ('alw', 'liber-a', {'a': 1000, 'b': -3, '\u05d0': 400}):
+            c = eq.Cipher(code)
+            self.assertEqual([c.sum(w) for w in _WORDS], c.sum_text_array(_WORDS).tolist())
+
+class TestIngest(unittest.TestCase):
+    def test_split_into_lexicon(self):
+        alw = eq.Cipher('alw')
+        alw.split_into_lexicon('One woman, one life.\n(Jesus!)')
+        self.assertEqual({'One', 'one', 'woman'}, alw._lexicon[46])
+        self.assertEqual({'life', 'Jesus'}, alw._lexicon[68])
+
+    def test_words_straddling_chunks(self):
+        text = "the woman's x-ray, the life; love is the law"
+        whole = eq.Cipher('alw')
+        whole.split_into_lexicon(text)
+        for size in (1, 2, 3, 7):
+            chunked = eq.Cipher('alw')
+            chunked.ingest_stream(text[i:i+size] for i in range(0, len(text), size))
+            self.assertEqual(whole._lexicon, chunked._lexicon)
+
+    def test_ingest_file(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('one woman\nlife Jesus\n')
+        try:
+            alw = eq.Cipher('alw')
+            alw.ingest_file(f.name, chunk_size=4)
+            self.assertEqual({'one', 'woman'}, alw._lexicon[46])
+            self.assertEqual({'life', 'Jesus'}, alw._lexicon[68])
+        finally:
+            os.unlink(f.name)
+
+class TestSavedLexicon(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'alw.lex')
+        self.alw = eq.Cipher('alw')
+        self.alw.split_into_lexicon('one woman life Jesus love is the law caf\u00e9')
+        self.alw.save_lexicon(self.path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        for use_mmap in (True, False):
+            loaded = eq.Cipher('alw')
+            loaded.load_lexicon(self.path, mmap=use_mmap)
+            self.assertEqual({'one', 'woman'}, loaded.words_for(46))
+            self.assertEqual(set(), loaded.words_for(47))
+            out1, out2 = io.StringIO(), io.StringIO()
+            self.alw.print_synonyms(out1)
+            loaded.print_synonyms(out2)
+            self.assertEqual(sorted(out1.getvalue().splitlines()), sorted(out2.getvalue().splitlines()))
+
+    def test_add_after_mmap_load(self):
+        loaded = eq.Cipher('alw')
+        loaded.load_lexicon(self.path)
+        loaded.add_to_lexicon(['Life', 'one', 'zzz'])
+        self.assertEqual({'life', 'Life', 'Jesus'}, loaded.words_for(68))
+        self.assertEqual({'one', 'woman'}, loaded.words_for(46))
+        self.assertEqual({'zzz'}, loaded.words_for(loaded.sum('zzz')))
+        resaved = os.path.join(self.tmpdir.name, 'again.lex')
+        loaded.save_lexicon(resaved)
+        again = eq.Cipher('alw')
+        again.load_lexicon(resaved, mmap=False)
+        self.assertEqual({'life', 'Life', 'Jesus'}, again.words_for(68))
+
+    def test_save_over_mapped_index(self):
+        loaded = eq.Cipher('alw')
+        loaded.load_lexicon(self.path)
+        loaded.add_to_lexicon(['zzz'])
+        loaded.save_lexicon(self.path)
+        again = eq.Cipher('alw')
+        again.load_lexicon(self.path, mmap=False)
+        self.assertEqual({'life', 'Jesus'}, again.words_for(68))
+        self.assertEqual({'zzz'}, again.words_for(again.sum('zzz')))
+        self.assertEqual(['alw.lex'], os.listdir(self.tmpdir.name))
+
+    def test_not_an_index(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'garbage')
+        with self.assertRaises(ValueError):
+            eq.Cipher('alw').load_lexicon(self.path)
+
+class TestCipherBank(unittest.TestCase):
+    def test_defaults_to_builtins(self):
+        bank = eq.CipherBank()
+        self.assertEqual(len(eq.Cipher.builtin_ciphers()), len(bank))
+        self.assertEqual(tuple(c.sum('Jesus') for c in bank.ciphers), bank.sums('Jesus'))
+
+    def test_sum_many_columns(self):
+        bank = eq.CipherBank(['alw', eq.Cipher({'a': -5, 'b': 3, '\u05d0': 400}), 'simple'])
+        columns = bank.sum_many(_WORDS)
+        self.assertEqual(3, len(columns))
+        for c, column in zip(bank.ciphers, columns):
+            self.assertEqual([c.sum(w) for w in _WORDS], list(column))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_matrix(self):
+        bank = eq.CipherBank(['alw', eq.Cipher({'a': -5, 'b': 3, '\u05d0': 400}), 'simple'])
+        expected = [[c.sum(w) for c in bank.ciphers] for w in _WORDS]
+        self.assertEqual(expected, bank.sum_text_array(_WORDS).tolist())
+
+class TestFindPhrases(unittest.TestCase):
+    def setUp(self):
+        self.smp = eq.Cipher('simple')
+        self.smp.split_into_lexicon('a b c d ab ba e')
+
+    def test_all_phrases(self):
+        self.assertEqual([('e',), ('a', 'd'), ('b', 'ab'), ('b', 'ba'), ('b', 'c')],
+                         list(self.smp.find_phrases(5)))
+        self.assertEqual([('b', 'ab', 'd'), ('b', 'ba', 'd'), ('b', 'c', 'd'), ('ab', 'ba', 'c')],
+                         [p for p in self.smp.find_phrases(9) if len(p) == 3 and 'e' not in p])
+
+    def test_limit_and_max_words(self):
+        self.assertEqual([('e',), ('a', 'd')], list(self.smp.find_phrases(5, limit=2)))
+        self.assertEqual([('e',)], list(self.smp.find_phrases(5, max_words=1)))
+        self.assertEqual([], list(eq.Cipher('alw').find_phrases(5)))
+
+    def test_negative_values(self):
+        c = eq.Cipher({'a': -2, 'b': 3, 'c': 5})
+        c.split_into_lexicon('a b c aa bb cc ac')
+        for phrase in c.find_phrases(1, 3):
+            self.assertEqual(1, sum(map(c.sum, phrase)))
+            self.assertEqual(len(phrase), len(set(phrase)))
+        self.assertEqual(3, len(list(c.find_phrases(1, 3))))
+
+class TestSortedSums(unittest.TestCase):
+    def setUp(self):
+        self.smp = eq.Cipher('simple')
+        self.smp.split_into_lexicon('a b c d ab ba e j')
+
+    def test_incremental_sorted_sums(self):
+        self.assertEqual([1, 2, 3, 4, 5, 10], list(self.smp._sorted_sums))
+        self.smp.add_to_lexicon(['h', 'cc', 'z'])
+        self.assertEqual([1, 2, 3, 4, 5, 6, 8, 10, 26], list(self.smp._sorted_sums))
+
+    def test_add_generator_in_batches(self):
+        with mock.patch.object(eq, '_ADD_BATCH', 3):
+            self.smp.add_to_lexicon(w for w in ['h', 'cc', 'z', 'ea', 'f', 'y', 'g'])
+        self.assertEqual({'h'}, self.smp.words_for(8))
+        self.assertEqual({'cc', 'ea', 'f'}, self.smp.words_for(6))
+        self.assertEqual([1, 2, 3, 4, 5, 6, 7, 8, 10, 25, 26], list(self.smp._sorted_sums))
+
+    def test_words_in_range(self):
+        self.assertEqual([(3, {'ab', 'ba', 'c'}), (4, {'d'})], list(self.smp.words_in_range(3, 4)))
+        self.assertEqual([], list(self.smp.words_in_range(6, 9)))
+
+    def test_nearest(self):
+        self.assertEqual([(5, {'e'})], self.smp.nearest(6))
+        self.assertEqual([5, 4, 10], [num for num, _ in self.smp.nearest(7, 3)])
+        self.assertEqual([10, 5], [num for num, _ in self.smp.nearest(100, 2)])
+
+    def test_histogram(self):
+        self.assertEqual([(1, 1), (2, 1), (3, 3), (4, 1), (5, 1), (10, 1)], self.smp.histogram())
+        self.assertEqual([(0, 6), (5, 1), (10, 1)], self.smp.histogram(5))
+        self.assertEqual([(2, 3), (4, 1)], self.smp.histogram(2, lo=3, hi=4))
+
+    def test_with_mapped_index(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'simple.lex')
+            self.smp.save_lexicon(path)
+            loaded = eq.Cipher('simple')
+            loaded.load_lexicon(path)
+            loaded.add_to_lexicon(['cb', 'h'])
+            self.assertEqual([(3, {'ab', 'ba', 'c'}), (4, {'d'}), (5, {'e', 'cb'})],
+                             list(loaded.words_in_range(3, 5)))
+            self.assertEqual([8, 10], [num for num, _ in loaded.nearest(9, 2)])
+            self.assertEqual([(0, 6), (5, 3), (10, 1)], loaded.histogram(5))
+
+class TestParallelLexicon(unittest.TestCase):
+    def test_matches_serial(self):
+        lines = ['one woman, one life', '', 'Jesus wept; caf\u00e9 x-ray', 'love is the law ' * 5]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for i in range(3):
+                paths.append(os.path.join(tmpdir, f'corpus{i}.txt'))
+                with open(paths[-1], 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(lines[i:] + lines[:i]) * 4)
+            serial = eq.Cipher('alw')
+            for path in paths:
+                serial.ingest_file(path)
+            for workers in (1, 2):
+                parallel = eq.Cipher('alw')
+                parallel.build_lexicon_parallel(paths, workers=workers, shard_size=7)
+                self.assertEqual(serial._lexicon, parallel._lexicon)
+                self.assertEqual(serial._sorted_sums, parallel._sorted_sums)
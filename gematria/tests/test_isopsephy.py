@@ -0,0 +1,67 @@
+# testing the hebrew and greek ciphers
+# Run from the directory with pypackage.toml as:
+#   python3 -m unittest discover -s tests
+import io
+import unicodedata
+import unittest
+from rwt_gematria import english as eq
+
+class TestHebrew(unittest.TestCase):
+    def setUp(self):
+        self.heb = eq.Cipher('hebrew')
+
+    def test_letters(self):
+        self.assertEqual(73, self.heb.sum('חכמה'))
+        self.assertEqual(1081, self.heb.sum('תפארת'))
+        self.assertEqual(496, self.heb.sum('מלכות'))
+
+    def test_finals_and_ligatures(self):
+        self.assertEqual(self.heb.sum('אמן'), self.heb.sum('אמנ'))
+        self.assertEqual(90, self.heb.sum('ץ'))
+        self.assertEqual(12, self.heb.sum('װ'))
+        self.assertEqual(31, self.heb.sum('ﭏ')) # alef-lamed
+
+    def test_niqqud_is_ignored(self):
+        self.assertEqual(43, self.heb.sum('בֶּאמֱּ'))
+        self.assertEqual(300, self.heb.sum('שּׁ')) # shin with dagesh and shin dot
+        words = ['בֶּאמֱּ', 'שּׁלוֹם', 'abc']
+        self.assertEqual([self.heb.sum(w) for w in words], list(self.heb.sum_many(words)))
+
+    def test_niqqud_stays_in_words(self):
+        self.heb.split_into_lexicon('בֶּאמֱּ, חכמה')
+        self.assertEqual({43: {'בֶּאמֱּ'}, 73: {'חכמה'}},
+                         dict(self.heb._lexicon))
+
+    def test_describe(self):
+        out = io.StringIO()
+        self.heb.describe(out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(6, len(lines))
+        self.assertEqual('א: 1\tב: 2\tג: 3\tד: 4\tה: 5', lines[0])
+
+class TestGreek(unittest.TestCase):
+    def setUp(self):
+        self.grk = eq.Cipher('greek')
+
+    def test_letters(self):
+        self.assertEqual(284, self.grk.sum('θεος'))
+        self.assertEqual(365, self.grk.sum('ΑΒΡΑΣΑΞ'))
+        self.assertEqual(6 + 90 + 900, self.grk.sum('ϝϙϡ'))
+
+    def test_accents_either_way(self):
+        decomposed = 'Ἰησους'
+        composed = unicodedata.normalize('NFC', decomposed)
+        self.assertNotEqual(decomposed, composed)
+        self.assertEqual(888, self.grk.sum(decomposed))
+        self.assertEqual(888, self.grk.sum(composed))
+        self.assertEqual([888, 888], list(self.grk.sum_many([decomposed, composed])))
+        self.assertEqual(93, self.grk.sum('ἀγάπη'))
+
+    def test_describe(self):
+        out = io.StringIO()
+        self.grk.describe(out)
+        text = out.getvalue()
+        self.assertEqual(7, len(text.splitlines()))
+        self.assertIn('ω: 800', text)
+        self.assertNotIn('A: 0', text)
+        self.assertNotIn('ά', text)
@@ -3,8 +3,13 @@ convert them to unicode.  The supported dialects are the hebrew
 romanization used by English occultists of the 19th/20th centuries,
 and a light form of betacode for greek."""
 
+import functools as _functools
+import itertools as _itertools
 import re as _re
-__all__ = ['hebrew','greek']
+import unicodedata as _unicodedata
+from collections import OrderedDict as _ordereddict
+from typing import Callable as _callable, TextIO as _textio
+__all__ = ['hebrew','greek','hebrew_stream','greek_stream','unhebrew','ungreek','Transliterator']
 
 ######################################################################
 # Hebrew section
@@ -61,17 +66,36 @@ _hebtbl = {
   'r':  "\u05c1"  # Dot Right,
 }
 
+# How many distinct tokens (a letter and its marks) each direction remembers the
+# conversion of.  Real texts use far fewer, but marks can be stacked without limit.
+# The caches are keyed by the token's text and the one thing its context decides
+# (whether it ends a word); on a miss the token is parsed again on its own.
+_TOKEN_CACHE_SIZE = 1 << 14
+
 _nqudRx = r';[3_7]?|[123_7*\\`lr]'
-_possFinRx = _re.compile(r'''
-  (?>K|M|N|P|Tz) # a potential final letter
-  (?=(?:{0})*+   # lookahead to a possible series of niqqud...
-    (?:\W|\Z))   # ...and then a non-letter
-  '''.format(_nqudRx), _re.X)
+# One pass does it all: a letter (which, if it could be final, checks whether only niqqud
+# stand between it and the end of the word), then up to 3 niqqud.
 _tokensRx = _re.compile(r'''
-  ((?>Ch|Sh|Tz|Th|Vv|[A-Z])[if]?+) # a letter
-  ({0})?+ ({0})?+ ({0})?+          # up to 3 niqqud
+  (?:
+    (?P<fin>K|M|N|P|Tz)                     # a final letter, if...
+      (?=(?:{0})*+(?:\W|\Z))                # ...only niqqud come before a non-letter
+  | (?P<let>(?>Ch|Sh|Tz|Th|Vv|[A-Z])[if]?+) # any other letter
+  )
+  (?P<n1>{0})?+ (?P<n2>{0})?+ (?P<n3>{0})?+ # up to 3 niqqud
   '''.format(_nqudRx), _re.X)
 
+@_functools.lru_cache(maxsize=_TOKEN_CACHE_SIZE)
+def _hebrew_token_text(token, fin):
+    """The unicode for a TOKEN matched by _tokensRx, with FIN set if it's a final letter."""
+    m = _tokensRx.fullmatch(token)
+    letter = m.group('let') or m.group('fin')
+    if fin is not None:
+        letter += 'f'
+    return ''.join(_hebtbl.get(x,x) for x in (letter, m.group('n1'), m.group('n2'), m.group('n3')) if x)
+
+def _hebrew_token(m):
+    return _hebrew_token_text(*m.group(0, 'fin'))
+
 def hebrew(text):
     """Convert romanized `text` to unicode hebrew.
   A  = aleph   B  = beth    G  = gimel    D  = dalet
@@ -93,10 +117,12 @@ def hebrew(text):
   7  = Kamatz               ;7 = Reduced Kamatz       
   Shl = Shin dot left       Shr = Shin dot right
 """
-    finalized = _possFinRx.sub(r'\g<0>f',text)
-    return _tokensRx.sub(
-            lambda m: ''.join(_hebtbl.get(x,x) for x in m.groups() if x),
-            finalized)
+    return _tokensRx.sub(_hebrew_token, text)
+
+def hebrew_stream(reader: _textio, writer: _textio, chunk_size: int = 1 << 20) -> None:
+    """Convert romanized hebrew from `reader` to unicode in `writer`, a chunk at a time.
+    See `hebrew` for the romanization."""
+    _convert_stream(hebrew, reader, writer, chunk_size)
 
 ######################################################################
 # Greek section
@@ -142,28 +168,91 @@ _grktbl = {
   '&': "\u0304", #macron
   '\'': "\u0306", #breve
   '?': "\u0323", #dot below
+  # TLG extras
+  '#': "\u0374", #numeral sign
+  '#1': "\u03df", '*#1': "\u03de", #koppa
+  '#2': "\u03db", '*#2': "\u03da", #stigma
+  '#3': "\u03d9", '*#3': "\u03d8", #archaic koppa
+  '#4': "\u0375", #lower numeral sign
+  '#5': "\u03e1", '*#5': "\u03e0", #sampi
+  ':': "\u00b7", #ano teleia
+  '_': "\u2014", #dash
+  '[1': "(", ']1': ")",
+  '[2': "\u27e8", ']2': "\u27e9",
+  '[3': "{", ']3': "}",
+  '[4': "\u27e6", ']4': "\u27e7",
 }
 
 _graccRx = r"[()/=\\+|&'?]"
-_sigmaFinalRx = _re.compile(r'''
-  (?>S)         # a sigma
-  (?=(?:{0})*+  # lookahead to a possible series of accents 
-   (?:\W|\Z))   # ...and then a non-letter
-  '''.format(_graccRx), _re.X)
+# One pass does it all, with a sigma becoming final when only accents stand between it
+# and the end of the word.
 _greekTokensRx = _re.compile(r'''
-  (\*?+)    # UC indicator
-  ({0}*+)   # possible accents
-  ((?>[A-Z][123]?))   # letter
-  ({0}*+)   # possible accents
+    (?P<punct>[:_]|[\[\]][1-4])  # punctuation and brackets
+  | (?P<uc>\*?+)        # UC indicator
+    (?P<pre>{0}*+)      # possible accents
+    (?>
+      (?P<sig>S)(?={0}*+(?:(?!\#)\W|_|\Z)) # a final sigma
+    | (?P<let>[A-Z][123]?|\#[1-5]?(?![0-9]))  # letter (other #n codes aren't supported)
+    )
+    (?P<post>{0}*+)     # possible accents
   '''.format(_graccRx), _re.X)
 
+@_functools.lru_cache(maxsize=_TOKEN_CACHE_SIZE)
+def _greek_token_text(token, sig):
+    """The unicode for a TOKEN matched by _greekTokensRx, with SIG set if it's a final sigma."""
+    m = _greekTokensRx.fullmatch(token)
+    if m.group('punct') is not None:
+        return _grktbl[m.group('punct')]
+    letter = m.group('uc') + ('S2' if sig is not None else m.group('let') or 'S')
+    return _grktbl.get(letter,letter) + ''.join(_grktbl.get(x,x) for x in (m.group('pre')+m.group('post')))
+
 def _greek_substitution(m):
     """Take the result of the _greekTokensRx regex match, and return the
     equivalent greek unicode"""
-    letter = m.group(1) + m.group(3)
-    return _grktbl.get(letter,letter) + ''.join(_grktbl.get(x,x) for x in (m.group(2)+m.group(4)))
+    return _greek_token_text(*m.group(0, 'sig'))
+
+def _compositions(blocks: list[range]) -> dict[tuple[str,frozenset[str]],str]:
+    """Map each (base, set of combining marks) to the precomposed character in `blocks`
+    with that canonical decomposition, as long as NFC would leave the character alone.
+    Characters which NFC replaces outright (like the numeral sign) map from themselves
+    with no marks to their replacement."""
+    table = {}
+    for block in blocks:
+        for cp in block:
+            ch = chr(cp)
+            nfc = _unicodedata.normalize('NFC', ch)
+            nfd = _unicodedata.normalize('NFD', ch)
+            if nfc == ch and len(nfd) > 1:
+                table[nfd[0], frozenset(nfd[1:])] = ch
+            elif nfc != ch and nfc == nfd:
+                table[ch, frozenset()] = nfc
+    return table
+
+_grk_compositions = _compositions([range(0x0370, 0x0400), range(0x1f00, 0x2000)])
+
+def _compose(text: str) -> str:
+    """Compose a converted token (a letter and its combining marks) into the precomposed
+    character for as many of the marks as have one, leaving the rest combining (in
+    canonical order).  The order the marks come in doesn't matter, as in betacode."""
+    base, marks = text[0], text[1:]
+    for n in range(len(marks), -1, -1):
+        for used in _itertools.combinations(range(len(marks)), n):
+            accents = frozenset(marks[i] for i in used)
+            if len(accents) == n and (base, accents) in _grk_compositions:
+                rest = sorted((x for i,x in enumerate(marks) if i not in used), key=_unicodedata.combining)
+                return _grk_compositions[base, accents] + ''.join(rest)
+    return base + ''.join(sorted(marks, key=_unicodedata.combining))
+
+@_functools.lru_cache(maxsize=_TOKEN_CACHE_SIZE)
+def _greek_composed_text(token, sig):
+    """As `_greek_token_text`, but with the accents composed into the letter."""
+    return _compose(_greek_token_text(token, sig))
+
+def _greek_composed_substitution(m):
+    """As `_greek_substitution`, but with the accents composed into the letter."""
+    return _greek_composed_text(*m.group(0, 'sig'))
 
-def greek(text):
+def greek(text, precomposed=False):
     """Convert betacode `text` to unicode greek. 
   *A/A  alpha         *B/B  beta
   *C/C  xi            *D/D  delta
@@ -185,7 +274,225 @@ def greek(text):
   \\  grave            +  diaeresis
   |  iota subscript   &  macron
   '  breve            ?  dot below
+  # TLG extras
+  #     numeral sign  #4  lower numeral sign
+  *#1/#1 koppa        *#2/#2 stigma
+  *#3/#3 archaic koppa *#5/#5 sampi
+  :     ano teleia    _   dash
+  [1 ]1  ( )          [2 ]2  angle brackets
+  [3 ]3  { }          [4 ]4  double square brackets
+
+Only this subset of the TLG codes is supported: the letters, marks and
+punctuation of running greek text.  The rest of the TLG set (quotation
+marks "n, the other #n symbols, % critical signs and the remaining
+bracket and page-format codes) runs to hundreds of editorial symbols,
+many with no unicode equivalent, and is left in the text as-is.
+
+With `precomposed`, accents are composed into the letters they go on (in
+any order) wherever unicode has a character for it.  For the combinations
+greek actually uses, written in the usual order (breathing or diaeresis,
+then accent, then iota subscript), this is the same text NFC normalization
+would give, without the cost of it.
 """
-    finalized = _sigmaFinalRx.sub(r'S2',text)
-    return _greekTokensRx.sub(_greek_substitution, finalized)
+    return _greekTokensRx.sub(_greek_composed_substitution if precomposed else _greek_substitution, text)
+
+def greek_stream(reader: _textio, writer: _textio, chunk_size: int = 1 << 20, precomposed: bool = False) -> None:
+    """Convert betacode greek from `reader` to unicode in `writer`, a chunk at a time.
+    See `greek` for the betacode."""
+    _convert_stream(lambda text: greek(text, precomposed), reader, writer, chunk_size)
+
+######################################################################
+# Streaming
+######################################################################
+
+def _convert_stream(convert: _callable[[str],str], reader: _textio, writer: _textio, chunk_size: int) -> None:
+    """Read `reader` in chunks of `chunk_size`, and write each converted chunk to `writer`.
+    Chunks are only converted up to their last whitespace, with the rest carried into
+    the next chunk: no letter, mark or final-form lookahead ever crosses whitespace, so
+    this converts exactly as if the whole text had been read at once."""
+    carry = ''
+    while chunk := reader.read(chunk_size):
+        text = carry + chunk
+        cut = max(text.rfind(ch) for ch in ' \n\t\r') + 1
+        if cut > 0:
+            writer.write(convert(text[:cut]))
+        carry = text[cut:]
+    if carry:
+        writer.write(convert(carry))
+
+
+######################################################################
+# Word cache
+######################################################################
+
+class Transliterator:
+    """Wraps a converter such as `hebrew` or `greek` with a bounded LRU cache of
+    whitespace-delimited words, for corpora where the same words recur over and
+    over.  Each distinct word goes through the converter once (while it stays in
+    the cache), and the result is the same as converting the whole text at once,
+    since no lookahead crosses whitespace.
+
+    `hits` and `misses` count the words found and not found in the cache."""
+
+    _wordsRx = _re.compile(r'[^ \n\t\r]+')
+
+    def __init__(self, convert: _callable[[str],str], maxsize: int = 1 << 16):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1!')
+        self.convert = convert
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache : _ordereddict[str,str] = _ordereddict()
+
+    def _word(self, m) -> str:
+        word = m.group()
+        result = self._cache.get(word)
+        if result is not None:
+            self.hits += 1
+            self._cache.move_to_end(word)
+            return result
+        self.misses += 1
+        result = self._cache[word] = self.convert(word)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return result
+
+    def __call__(self, text: str) -> str:
+        """Convert `text` a word at a time, through the cache."""
+        return self._wordsRx.sub(self._word, text)
+
+    def stream(self, reader: _textio, writer: _textio, chunk_size: int = 1 << 20) -> None:
+        """Convert from `reader` to `writer` a chunk at a time, through the cache."""
+        _convert_stream(self, reader, writer, chunk_size)
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of words so far which were found in the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def clear(self) -> None:
+        """Empty the cache and reset the counts."""
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+
+######################################################################
+# Reverse transliteration (unicode -> romanized)
+######################################################################
+
+def _invert(table: dict[str,str]) -> dict[str,str]:
+    """Map each unicode string in `table` back to its first (shortest) romanization."""
+    inverse : dict[str,str] = {}
+    for roman,uni in table.items():
+        inverse.setdefault(uni, roman)
+    return inverse
+
+def _decompositions(blocks: list[range], known: dict[str,str]) -> dict[int,str]:
+    """A `str.translate` table taking each precomposed character in `blocks` to its full
+    canonical decomposition, when every character of that decomposition is `known`."""
+    def decompose(ch: str) -> str:
+        parts = _unicodedata.decomposition(ch).split()
+        if not parts or parts[0].startswith('<'):
+            return ch
+        return ''.join(decompose(chr(int(p, 16))) for p in parts)
+    table = {}
+    for block in blocks:
+        for cp in block:
+            full = decompose(chr(cp))
+            if full != chr(cp) and all(ch in known for ch in full):
+                table[cp] = full
+    return table
+
+_unhebtbl = _invert(_hebtbl)
+_heb_finals = { _hebtbl[k+'f']: k for k in ('K','M','N','P','Tz') }
+_heb_medials = { _hebtbl[k]: k for k in ('K','M','N','P','Tz') }
+_heb_letters = ''.join(ch for ch in _unhebtbl if _unicodedata.category(ch) == 'Lo' and ch not in _heb_finals and ch not in _heb_medials)
+_heb_marks = ''.join(ch for ch in _unhebtbl if _unicodedata.category(ch) == 'Mn')
+_heb_decompose = _decompositions([range(0xfb1d, 0xfb50)], _unhebtbl)
+_unhebTokensRx = _re.compile(r'''
+  (?:
+    (?P<fin>[{0}])                           # a letter with a final form, and whether...
+    (?:(?P<end>(?=[{1}{2}]*+(?:\W|\Z)))|)    # ...only (romanized) niqqud follow it in its word
+  | (?P<let>[{3}])                           # any other letter
+  )
+  (?P<nq>[{1}]*+)                            # its niqqud
+  '''.format(_re.escape(''.join(_heb_finals) + ''.join(_heb_medials)), _heb_marks,
+             _re.escape(';123_7*\\`lr'), _heb_letters), _re.X)
+
+@_functools.lru_cache(maxsize=_TOKEN_CACHE_SIZE)
+def _unhebrew_token_text(token, end):
+    """The romanization of a TOKEN matched by _unhebTokensRx, with END set at the end of a word."""
+    fin, let, nq = _unhebTokensRx.fullmatch(token).group('fin', 'let', 'nq')
+    at_end = end is not None
+    if fin is None:
+        letter = _unhebtbl[let]
+    elif fin in _heb_finals: # hebrew() only makes a plain letter final at the end of a word
+        letter = _heb_finals[fin] if at_end else _heb_finals[fin] + 'f'
+    else:
+        letter = _heb_medials[fin] + 'i' if at_end else _heb_medials[fin]
+    niqqud = [_unhebtbl[x] for x in nq]
+    if any(a == ';' and b[0] in '3_7' for a,b in zip(niqqud, niqqud[1:])):
+        # `;3` etc. would read back as a reduced vowel, so the sh'va goes last (which
+        # is canonically equivalent, as nothing else shares its combining class)
+        niqqud = [x for x in niqqud if x != ';'] + [x for x in niqqud if x == ';']
+    return letter + ''.join(niqqud)
+
+def _unhebrew_token(m):
+    return _unhebrew_token_text(*m.group(0, 'end'))
+
+def unhebrew(text):
+    """Convert unicode hebrew `text` to the romanization read by `hebrew`, so that
+    `hebrew(unhebrew(text))` gives back `text`, up to the order of the niqqud,
+    for hebrew letters with up to 3 niqqud each.  Final letters are only marked
+    (`Kf`, `Ki`, ...) where `hebrew` would not pick the same form on its own,
+    and precomposed presentation forms are decomposed first.  Other characters
+    are left alone, so ones which mean something in the romanization (latin
+    letters, or `;` and digits right after a hebrew letter) won't come back."""
+    return _unhebTokensRx.sub(_unhebrew_token, text.translate(_heb_decompose))
+
+_ungrktbl = _invert(_grktbl)
+_ungrktbl['\u02b9'] = '#' # the numeral sign, as NFC (and precomposed greek()) writes it
+_grk_marks = ''.join(ch for ch in _ungrktbl if _unicodedata.category(ch) == 'Mn')
+_grk_letters = ''.join(ch for ch in _ungrktbl if ch not in _grk_marks and ch not in 'σς')
+_grk_capitals = ''.join(ch for ch in _grk_letters if ch.isupper())
+_grk_decompose = _decompositions([range(0x0370, 0x0400), range(0x1f00, 0x2000)], _ungrktbl | {'ς': 'S2'})
+_ungreekTokensRx = _re.compile(r'''
+  (?:
+    (?P<sig>[σς])                           # a sigma, and whether...
+    (?:(?P<end>(?=[{0}{1}]*+(?:\W|[{2}]|\Z)))|) # ...only (romanized) accents follow it in its word
+  | (?P<let>[{3}])                          # any other letter
+  )
+  (?P<acc>[{0}]*+)                          # its accents
+  '''.format(_grk_marks, _re.escape("/=\\+|&'?"), _grk_capitals, _re.escape(_grk_letters)), _re.X)
+
+@_functools.lru_cache(maxsize=_TOKEN_CACHE_SIZE)
+def _ungreek_token_text(token, end):
+    """The betacode for a TOKEN matched by _ungreekTokensRx, with END set at the end of a word."""
+    sig, let, acc = _ungreekTokensRx.fullmatch(token).group('sig', 'let', 'acc')
+    at_end = end is not None
+    if sig is None:
+        letter = _ungrktbl[let]
+    elif sig == 'ς': # greek() only makes a plain S final at the end of a word
+        letter = 'S' if at_end else 'S2'
+    else:
+        letter = 'S1' if at_end else 'S'
+    return letter + ''.join(_ungrktbl[x] for x in acc)
+
+def _ungreek_token(m):
+    return _ungreek_token_text(*m.group(0, 'end'))
 
+def ungreek(text):
+    """Convert unicode greek `text` to the betacode read by `greek`, so that
+    `greek(ungreek(text))` gives back `text` with every precomposed character
+    decomposed (as `greek` writes accents as combining marks, unless asked for
+    precomposed characters).  Sigmas
+    are only marked (`S1`, `S2`) where `greek` would not pick the same form
+    on its own.  Other characters are left alone, so ones which mean something
+    in betacode (latin letters, or accent marks right after a greek letter)
+    won't come back."""
+    return _ungreekTokensRx.sub(_ungreek_token, text.translate(_grk_decompose))
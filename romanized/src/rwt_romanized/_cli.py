@@ -3,30 +3,69 @@
 from __future__ import annotations
 
 import argparse
+import codecs
 import fileinput
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
 
-from rwt_romanized import greek, hebrew
+from rwt_romanized import Transliterator, greek, hebrew
 
 
-def to_entity(ch: str) -> str:
-    numeric = ord(ch)
-    if numeric < 128:
-        return ch
-    return f"&#x{numeric:04x};"
+def _hex_charrefs(err: UnicodeEncodeError) -> tuple[str, int]:
+    """Encoding error handler: replace each non-ascii character with a hex character reference."""
+    return "".join(f"&#x{ord(ch):04x};" for ch in err.object[err.start : err.end]), err.end
 
 
-def process_hebrew(line: str) -> None:
-    unicode = hebrew(line)
-    print(unicode)
-    entities = "".join(to_entity(ch) for ch in unicode)
-    print("{{hebrew text|", entities, "}}", sep="")
+codecs.register_error("rwt_romanized.hexcharref", _hex_charrefs)
 
 
-def process_greek(line: str) -> None:
-    unicode = greek(line)
-    print(unicode)
-    entities = "".join(to_entity(ch) for ch in unicode)
-    print(entities)
+def to_entities(text: str) -> str:
+    """Replace every non-ascii character in `text` with an html hex character reference."""
+    return text.encode("ascii", "rwt_romanized.hexcharref").decode("ascii")
+
+
+# real texts repeat the same words over and over, so convert each one only once
+_hebrew_words = Transliterator(hebrew)
+_greek_words = Transliterator(greek)
+
+
+def process_hebrew(lines: list[str]) -> str:
+    unicode = _hebrew_words("\n".join(lines)).split("\n")
+    entities = to_entities("\n".join(unicode)).split("\n")
+    return "".join(f"{u}\n{{{{hebrew text|{e}}}}}\n" for u, e in zip(unicode, entities))
+
+
+def process_greek(lines: list[str]) -> str:
+    unicode = _greek_words("\n".join(lines)).split("\n")
+    entities = to_entities("\n".join(unicode)).split("\n")
+    return "".join(f"{u}\n{e}\n" for u, e in zip(unicode, entities))
+
+
+def convert_file(path: str, processor: Callable[[list[str]], str]) -> str:
+    """The output for the file at `path`, converted a block of lines at a time."""
+    with open(path) as f:
+        return "".join(
+            processor([line.rstrip() for line in lines]) for lines in itertools.batched(f, 4096)
+        )
+
+
+def _convert_to(path: str, out_path: str, processor: Callable[[list[str]], str]) -> None:
+    with open(out_path, "w", encoding="utf-8") as out:
+        out.write(convert_file(path, processor))
+
+
+def _run_many(fn, args: list[tuple], workers: int | None):
+    """Yield `fn` over `args` in order, from a process pool unless there's only one worker or item."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(args) <= 1:
+        yield from (fn(*a) for a in args)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(args))) as pool:
+        yield from pool.map(fn, *zip(*args), chunksize=max(1, len(args) // (workers * 4)))
 
 
 def main() -> None:
@@ -41,6 +80,15 @@ def main() -> None:
         choices=["heb", "grk"],
         help="Choose the language (default heb)",
     )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="Number of worker processes (default: one per CPU)"
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default=None,
+        help="Write each file's output to a file of the same name in this directory",
+    )
     parser.add_argument("filenames", metavar="filename", type=str, nargs="*")
     args = parser.parse_args()
 
@@ -50,6 +98,28 @@ def main() -> None:
         case "grk":
             processor = process_greek
 
+    if args.output_dir is not None:
+        if not args.filenames or "-" in args.filenames:
+            parser.error("--output-dir needs input files, not stdin")
+        out_paths = [os.path.join(args.output_dir, os.path.basename(name)) for name in args.filenames]
+        if len(set(out_paths)) != len(out_paths):
+            parser.error("input files with the same name would overwrite each other's output")
+        for name, out in zip(args.filenames, out_paths):
+            if os.path.exists(out) and os.path.samefile(name, out):
+                parser.error(f"the output for {name} would overwrite it")
+        os.makedirs(args.output_dir, exist_ok=True)
+        jobs = [(name, out, processor) for name, out in zip(args.filenames, out_paths)]
+        for _ in _run_many(_convert_to, jobs, args.jobs):
+            pass
+        return
+
+    if len(args.filenames) > 1 and "-" not in args.filenames and args.jobs != 1:
+        # convert whole files in parallel, writing each one's output in order
+        for output in _run_many(convert_file, [(name, processor) for name in args.filenames], args.jobs):
+            sys.stdout.write(output)
+        return
+
+    # convert a block of lines at a time, and write each block's output all at once
     with fileinput.input(args.filenames) as f:
-        for line in f:
-            processor(line.rstrip())
\ No newline at end of file
+        for lines in itertools.batched(f, 4096):
+            sys.stdout.write(processor([line.rstrip() for line in lines]))
\ No newline at end of file
@@ -0,0 +1,41 @@
+# Run from the directory with pypackage.toml as:
+#   python3 -m unittest discover -s tests
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from rwt_romanized import _cli
+
+class TestOutputDir(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.inputs = []
+        for name, text in (('a.txt', 'ABG\n'), ('b.txt', 'MLK\n')):
+            path = os.path.join(self.tmpdir.name, name)
+            with open(path, 'w') as f:
+                f.write(text)
+            self.inputs.append(path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_cli(self, *argv):
+        with mock.patch('sys.argv', ['unromanize', *argv]):
+            _cli.main()
+
+    def test_output_dir(self):
+        out_dir = os.path.join(self.tmpdir.name, 'out')
+        self.run_cli('-j', '1', '-o', out_dir, *self.inputs)
+        with open(os.path.join(out_dir, 'b.txt'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'מלך\n{{hebrew text|&#x05de;&#x05dc;&#x05da;}}\n')
+
+    def test_output_over_input(self):
+        with self.assertRaises(SystemExit) as cm, contextlib.redirect_stderr(io.StringIO()) as err:
+            self.run_cli('-o', self.tmpdir.name, *self.inputs)
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('would overwrite it', err.getvalue())
+        with open(self.inputs[0]) as f:
+            self.assertEqual(f.read(), 'ABG\n')
@@ -1,8 +1,11 @@
 # Run from the directory with pypackage.toml as:
 #   python3 -m unittest discover -s tests
 
+import io
+import random
+import unicodedata
 import unittest
-from rwt_romanized import greek 
+from rwt_romanized import greek, greek_stream, ungreek
 
 class TestGreek(unittest.TestCase):
     def test_abg(self):
@@ -25,3 +28,58 @@ class TestGreek(unittest.TestCase):
         result = greek('*)B?A')
         self.assertEqual(result, "\u0392\u0313\u0323\u03b1")
 
+    def test_finals_through_accents(self):
+        self.assertEqual(greek('S) SA'), "\u03c2\u0313 \u03c3\u03b1")
+        self.assertEqual(greek('*(*S.'), "*(\u03a3.")
+        self.assertEqual(greek('LOGOS, S1'), "\u03bb\u03bf\u03b3\u03bf\u03c2, \u03c3")
+
+    def test_passthrough(self):
+        self.assertEqual(greek('A1 J *'), 'A1 J *')
+
+    def test_token_cache_is_bounded(self):
+        import rwt_romanized
+        rng = random.Random(3)
+        for _ in range(rwt_romanized._TOKEN_CACHE_SIZE + 100):
+            text = 'S' + ''.join(rng.choices(")(/=\\+|&", k=10))
+            self.assertEqual(greek(text), greek(text + ' ').rstrip())
+        self.assertLessEqual(rwt_romanized._greek_token_text.cache_info().currsize, rwt_romanized._TOKEN_CACHE_SIZE)
+        # the same token converts by its context: a medial sigma, then a final one
+        self.assertEqual(greek('S/A S/'), '\u03c3\u0301\u03b1 \u03c2\u0301')
+
+    def test_stream(self):
+        text = "*)EN A)RXH=| H)=N O( LO/GOS,\nKAI\\ O( LO/GOS S) SA *(*S."
+        for chunk_size in (1, 2, 5, 1 << 20):
+            out = io.StringIO()
+            greek_stream(io.StringIO(text), out, chunk_size)
+            self.assertEqual(out.getvalue(), greek(text))
+
+    def test_tlg(self):
+        self.assertEqual(greek('A#:*#2 #5 LO/GOS_[1S]1'), "\u03b1\u0374\u00b7\u03da \u03e1 \u03bb\u03bf\u0301\u03b3\u03bf\u03c2\u2014(\u03c2)")
+        # unsupported TLG codes are left alone
+        self.assertEqual(greek('"3LO/GOS"3 #12 %5 [5A]5'), '"3\u03bb\u03bf\u0301\u03b3\u03bf\u03c2"3 #12 %5 [5\u03b1]5')
+        self.assertEqual(greek('[2A]2 [3A]3 [4A]4 [A]'), "\u27e8\u03b1\u27e9 {\u03b1} \u27e6\u03b1\u27e7 [\u03b1]")
+
+    def test_precomposed(self):
+        text = "*)EN A)RXH=| H)=N O( LO/GOS,\nKAI\\ O( LO/GOS H)=N PRO\\S TO\\N QEO/N: I+/ *(=W| A#"
+        self.assertEqual(greek(text, precomposed=True), unicodedata.normalize('NFC', greek(text)))
+        self.assertEqual(greek('A/) A)/ A?)/', precomposed=True), "\u1f04 \u1f04 \u1f04\u0323")
+        out = io.StringIO()
+        greek_stream(io.StringIO(text), out, 5, precomposed=True)
+        self.assertEqual(out.getvalue(), greek(text, precomposed=True))
+
+    def test_ungreek(self):
+        self.assertEqual(ungreek('ἐν ἀρχῇ ἦν ὁ λόγος'), 'E)N A)RXH=| H)=N O( LO/GOS')
+        self.assertEqual(ungreek('σς ΣΑΣ ϲ'), 'SS *S*A*S S3')
+        self.assertEqual(ungreek('Ἄ'), '*A)/')
+        self.assertEqual(ungreek('ἄ (ϛʹ)· —'), 'A)/ [1#2#]1: _')
+
+    def test_ungreek_roundtrip(self):
+        letters = 'αβγδεζηθικλμνξοπρστυφχψωςϲϝϛϡ' + 'ΑΒΓΔΕΖΗΘΙΚΛΜΝΞΟΠΡΣΤΥΦΧΨΩϹϜϚϠ' + 'ἀἄᾆῥὺῷΐἘὭ'
+        marks = '\u0313\u0314\u0301\u0342\u0300\u0308\u0345\u0304\u0306\u0323'
+        rng = random.Random(0)
+        for _ in range(2000):
+            text = ''.join(''.join(rng.choice(letters) + ''.join(rng.choices(marks, k=rng.randint(0,2)))
+                                   for _ in range(rng.randint(1,4))) + rng.choice(' .,\n·—')
+                           for _ in range(rng.randint(0,4)))
+            self.assertEqual(unicodedata.normalize('NFD', greek(ungreek(text))),
+                             unicodedata.normalize('NFD', text), repr(text))
@@ -1,8 +1,11 @@
 # Run from the directory with pypackage.toml as:
 #   python3 -m unittest discover -s tests
 
+import io
+import random
+import unicodedata
 import unittest
-from rwt_romanized import hebrew
+from rwt_romanized import Transliterator, hebrew, hebrew_stream, unhebrew
 
 class TestHebrew(unittest.TestCase):
     def test_abg(self):
@@ -55,3 +58,49 @@ class TestHebrew(unittest.TestCase):
         result = hebrew('MLKVTh')
         self.assertEqual(result, 'מלכות')
 
+    def test_finals_through_niqqud(self):
+        self.assertEqual(hebrew('M7 AM*'), "\u05dd\u05b8 \u05d0\u05dd\u05bc")
+        self.assertEqual(hebrew('M*A'), "\u05de\u05bc\u05d0")
+        self.assertEqual(hebrew('Tz, MTz7'), "\u05e5, \u05de\u05e5\u05b8")
+
+    def test_passthrough(self):
+        # only 3 niqqud attach to a letter, and unknown text is left alone
+        self.assertEqual(hebrew('AN1;3*_ B'), "\u05d0\u05df\u05b4\u05b1\u05bc_ \u05d1")
+        self.assertEqual(hebrew('Hello X'), "\u05d4ello X")
+
+    def test_stream(self):
+        text = "B3RAShITh BRA ALHIM ATh HShMIM\nVATh HARTz, MLKVTh M7 AM* Tz"
+        for chunk_size in (1, 2, 5, 1 << 20):
+            out = io.StringIO()
+            hebrew_stream(io.StringIO(text), out, chunk_size)
+            self.assertEqual(out.getvalue(), hebrew(text))
+
+    def test_transliterator(self):
+        text = "B3RAShITh BRA ALHIM\nATh HShMIM VATh HARTz,  M7 AM* Tz\tAM* M7 AM*"
+        words = Transliterator(hebrew, maxsize=2)
+        self.assertEqual(words(text), hebrew(text))
+        self.assertEqual((words.hits, words.misses), (2, 11))
+        self.assertEqual(len(words), 2)
+        out = io.StringIO()
+        words.stream(io.StringIO(text), out, 5)
+        self.assertEqual(out.getvalue(), hebrew(text))
+        words.clear()
+        self.assertEqual((words.hits, words.misses, words.hit_rate), (0, 0, 0.0))
+
+    def test_unhebrew(self):
+        self.assertEqual(unhebrew('מלכות'), 'MLKVTh')
+        self.assertEqual(unhebrew('בְּרֵאשִׁית'), 'B;*R2ASh1rITh')
+        self.assertEqual(unhebrew('ם מ ןכ'), 'M Mi NfKi')
+        self.assertEqual(unhebrew('\ufb2c'), 'Sh*r')
+        self.assertEqual(unhebrew('ױְַ'), 'Vi_;')
+
+    def test_unhebrew_roundtrip(self):
+        letters = 'אבגדהוזחטיכךלמםנןסעפףצץקרשתװױײ'
+        marks = '\u05b0\u05b1\u05b2\u05b3\u05b4\u05b5\u05b6\u05b7\u05b8\u05b9\u05bb\u05bc\u05c1\u05c2'
+        rng = random.Random(0)
+        for _ in range(2000):
+            text = ''.join(''.join(rng.choice(letters) + ''.join(rng.choices(marks, k=rng.randint(0,3)))
+                                   for _ in range(rng.randint(1,4))) + rng.choice(' .,\n')
+                           for _ in range(rng.randint(0,4)))
+            self.assertEqual(unicodedata.normalize('NFD', hebrew(unhebrew(text))),
+                             unicodedata.normalize('NFD', text), repr(text))
@@ -39,24 +39,18 @@ def decrypt_command(args: argparse.Namespace) -> None:
 
 
 def check_command(args: argparse.Namespace) -> None:
-    for file in args.filename:
-        print("Checking", file, end="")
-        with open(file, "rb") as infile:
-            if crypt.check(args.password, infile):
-                print(" -> ok!")
-            else:
-                print(" -> error!")
+    results = crypt.check_many(args.password, args.filename, args.jobs)
+    for file, ok in zip(args.filename, results):
+        print("Checking", file, "-> ok!" if ok else "-> error!")
 
 
 def rekey_command(args: argparse.Namespace) -> None:
-    for file in args.filename:
-        print("Changing password for", file, end="")
-        try:
-            with open(file, "r+b") as infile:
-                crypt.change_password(args.password, args.newpass, infile)
-                print(" -> ok!")
-        except Exception as e:
-            print(" -> error!", e)
+    results = crypt.rekey_many(args.password, args.newpass, args.filename, args.jobs)
+    for file, err in zip(args.filename, results):
+        if err is None:
+            print("Changing password for", file, "-> ok!")
+        else:
+            print("Changing password for", file, "-> error!", err)
 
 
 def main() -> None:
@@ -75,6 +69,9 @@ def main() -> None:
     encrypt_parser.add_argument("filename", type=str, default=None, nargs="*")
     check_parser = subparsers.add_parser("check", help="Check a password on files")
     check_parser.add_argument("--password", type=str, required=True, help="Password for decryption")
+    check_parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="Number of worker processes (default: one per CPU)"
+    )
     check_parser.add_argument("filename", type=str, default=None, nargs="*")
     decrypt_parser = subparsers.add_parser("decrypt", help="Decrypt files")
     decrypt_parser.add_argument("--password", type=str, required=True, help="Password for decryption")
@@ -82,6 +79,9 @@ def main() -> None:
     rekey_parser = subparsers.add_parser("rekey", help="Change password of encrypted file")
     rekey_parser.add_argument("--password", type=str, required=True, help="Old password for decryption")
     rekey_parser.add_argument("--newpass", type=str, required=True, help="New password for encryption")
+    rekey_parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="Number of worker processes (default: one per CPU)"
+    )
     rekey_parser.add_argument("filename", type=str, default=None, nargs="*")
     args = parser.parse_args()
     match args.command:
@@ -1,16 +1,31 @@
 from . import _internal
 from . import hash as _hash
-from typing import BinaryIO
+from typing import BinaryIO, Iterable, NamedTuple
+from concurrent.futures import ProcessPoolExecutor
 import os # for urandom
 
-def _keygen(passw: str, iv: bytes, rounds: int = 30_000) -> _internal.SpritzKernel:
+class _PassHashes(NamedTuple):
+    """The password-derived hashes that don't depend on the file: the 64-byte
+    hash fed to keygen, and the 4-byte mask over the stored IV."""
+    keygen: bytes
+    iv_mask: bytes
+
+def _pass_hashes(passw: str) -> _PassHashes:
+    """Compute the per-password hashes once, so they can be reused across files."""
+    encoded = passw.encode('utf-8')
+    return _PassHashes(bytes(_hash.hash_buffer(encoded, 64)), bytes(_hash.hash_buffer(encoded, 4)))
+
+def _keygen(passw: str|_PassHashes, iv: bytes, rounds: int = 30_000) -> _internal.SpritzKernel:
     """Perform keygen on password `passw` and initializatino vector `iv` for `rounds` rounds.
+    `passw` may also be the precomputed result of `_pass_hashes`.
     Return an initialized SpritzKernel that's absorbed the resulting key."""
     if len(iv) < 4:
         raise ValueError('IV for keygen must be at least 4 bytes!')
     iv = bytearray(iv)
     kernel = _internal.SpritzKernel()
-    passbytes = _hash.hash_buffer(passw.encode(), 64)
+    if isinstance(passw, str):
+        passw = _pass_hashes(passw)
+    passbytes = bytearray(passw.keygen)
     for _ in range(rounds + iv[3]):
         kernel.absorb(iv)
         kernel.absorb_stop()
@@ -64,10 +79,12 @@ class _Header:
             raise ValueError('Encryption key must by 64 bytes!')
         self._key = value
 
-    def read(self, file: BinaryIO, passw: str) -> None:
+    def read(self, file: BinaryIO, passw: str|_PassHashes) -> None:
+        if isinstance(passw, str):
+            passw = _pass_hashes(passw)
         tmp = bytearray(4)
         _read_exact(file, tmp)
-        pass_hash = _hash.hash_buffer(passw.encode('utf-8'), 4)
+        pass_hash = passw.iv_mask
         self.iv = bytes(tmp[i] ^ pass_hash[i] for i in range(4))
         cipher = _keygen(passw, self.iv)
         header = bytearray(72)
@@ -81,8 +98,10 @@ class _Header:
             raise ValueError('The header or password is invalid!')
         self.key = bytes(header_mv[8:])
 
-    def write(self, file: BinaryIO, passw: str) -> None:
-        file_iv = _hash.hash_buffer(passw.encode('utf-8'), 4)
+    def write(self, file: BinaryIO, passw: str|_PassHashes) -> None:
+        if isinstance(passw, str):
+            passw = _pass_hashes(passw)
+        file_iv = bytearray(passw.iv_mask)
         for i in range(4): file_iv[i] ^= self.iv[i]
         file.write(file_iv)
         cipher = _keygen(passw, self.iv)
@@ -178,4 +197,51 @@ def change_password(old_passw: str, new_passw: str, file: BinaryIO) -> None:
     header.read(file, old_passw)
     header.iv = os.urandom(4) # reset the IV to change it, but leave .key alone. 
     file.seek(0)
-    header.write(file, new_passw)
\ No newline at end of file
+    header.write(file, new_passw)
+
+def _check_one(hashes: _PassHashes, path: str) -> bool:
+    """Worker for `check_many`: read only the header of the file at `path`."""
+    try:
+        with open(path, 'rb') as infile:
+            _Header().read(infile, hashes)
+    except (ValueError, EOFError, OSError):
+        return False
+    return True
+
+def _rekey_one(old_hashes: _PassHashes, new_hashes: _PassHashes, path: str) -> Exception|None:
+    """Worker for `rekey_many`: rewrite the 76-byte header of the file at `path` in place."""
+    try:
+        with open(path, 'r+b') as file:
+            header = _Header()
+            header.read(file, old_hashes)
+            header.iv = os.urandom(4)
+            file.seek(0)
+            header.write(file, new_hashes)
+    except (ValueError, EOFError, OSError) as e:
+        return e
+    return None
+
+def _run_many(fn, args: list[tuple], workers: int|None) -> list:
+    """Run `fn` over `args`, in a process pool unless there's only one worker or item."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(args) <= 1:
+        return [fn(*a) for a in args]
+    with ProcessPoolExecutor(max_workers=min(workers, len(args))) as pool:
+        return list(pool.map(fn, *zip(*args), chunksize=max(1, len(args) // (workers * 4))))
+
+def check_many(passw: str, paths: Iterable[str], workers: int|None = None) -> list[bool]:
+    """Like `check`, but for many files on disk at once.  The password hashes are
+    computed once, and the per-file keygens are spread over `workers` processes
+    (default: one per CPU).  Returns a bool for each path, in order."""
+    hashes = _pass_hashes(passw)
+    return _run_many(_check_one, [(hashes, p) for p in paths], workers)
+
+def rekey_many(old_passw: str, new_passw: str, paths: Iterable[str], workers: int|None = None) -> list[Exception|None]:
+    """Like `change_password`, but for many files on disk at once.  Only the header
+    of each file is rewritten, in place.  The password hashes are computed once, and
+    the per-file keygens are spread over `workers` processes (default: one per CPU).
+    Returns, for each path in order, None on success or the exception that stopped it."""
+    old_hashes = _pass_hashes(old_passw)
+    new_hashes = _pass_hashes(new_passw)
+    return _run_many(_rekey_one, [(old_hashes, new_hashes, p) for p in paths], workers)
@@ -0,0 +1,43 @@
+# testing the many-file check and rekey
+# Run from the directory with pypackage.toml as:
+#   python3 -m unittest discover -s tests
+import io
+import os
+import tempfile
+import unittest
+from rwt_spritz import crypt
+
+class TestMany(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.contents = [f'file number {i}\n'.encode() * (i + 1) for i in range(2)]
+        self.paths = []
+        for i, data in enumerate(self.contents):
+            path = os.path.join(self.dir.name, f'f{i}.spritz')
+            with open(path, 'wb') as outfile:
+                crypt.encrypt('old', f'f{i}.txt', io.BytesIO(data), outfile)
+            self.paths.append(path)
+        self.bad = os.path.join(self.dir.name, 'bad.spritz')
+        with open(self.bad, 'wb') as outfile:
+            outfile.write(b'not an encrypted file')
+        self.missing = os.path.join(self.dir.name, 'missing.spritz')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_rekey_round_trip(self):
+        paths = self.paths + [self.bad, self.missing]
+        results = crypt.rekey_many('old', 'new', paths, workers=2)
+        self.assertEqual(results[:2], [None, None])
+        self.assertIsInstance(results[2], (ValueError, EOFError))
+        self.assertIsInstance(results[3], FileNotFoundError)
+        self.assertEqual(crypt.check_many('old', paths, workers=2), [False] * 4)
+        self.assertEqual(crypt.check_many('new', paths, workers=2), [True, True, False, False])
+        for i, (path, data) in enumerate(zip(self.paths, self.contents)):
+            with open(path, 'rb') as infile:
+                out = io.BytesIO()
+                self.assertEqual(crypt.decrypt('new', infile, out), f'f{i}.txt')
+                self.assertEqual(out.getvalue(), data)
+
+    def test_check_missing_file(self):
+        self.assertEqual(crypt.check_many('old', [self.missing, self.paths[0]], workers=2), [False, True])